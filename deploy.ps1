@@ -112,7 +112,7 @@ User=ubuntu
 Group=ubuntu
 WorkingDirectory=/home/ubuntu/app/src/api
 Environment="PATH=/home/ubuntu/app/venv/bin"
-ExecStart=/home/ubuntu/app/venv/bin/gunicorn --workers 2 --bind 0.0.0.0:5000 app:app
+ExecStart=/home/ubuntu/app/venv/bin/gunicorn -c gunicorn.conf.py app:app
 
 [Install]
 WantedBy=multi-user.target
@@ -150,6 +150,11 @@ systemctl restart nginx
 # Initialize the database
 cd /home/ubuntu/app/src/database
 mysql -h $DB_ENDPOINT -u $DB_USERNAME -p$DB_PASSWORD $DB_NAME < schema.sql
+
+# Apply schema migrations; they are safe to run on a freshly created schema
+for f in migrations/*.sql; do
+    mysql -h $DB_ENDPOINT -u $DB_USERNAME -p$DB_PASSWORD $DB_NAME < "`$f"
+done
 "@
 
 # Launch EC2 instance - Free Tier compatible AMI (Amazon Linux 2)
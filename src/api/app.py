@@ -1,14 +1,22 @@
 from flask import Flask, request, jsonify
-import mysql.connector
 from mysql.connector import Error
 import os
 from dotenv import load_dotenv
 from flask_cors import CORS
-import json
-from datetime import datetime, date
-from flask_jwt_extended import JWTManager
+from flask_compress import Compress
+import uuid
+import hashlib
+from functools import wraps, lru_cache
+from datetime import datetime
 from flasgger import Swagger
 
+from pydantic import ValidationError
+from schemas import PatientIn, PatientUpdate, VitalsIn, format_validation_error
+from db import get_db_pool, create_db_connection, db_cursor, get_db, close_db
+from serialization import OrjsonProvider, dumps, stream_json_rows
+from response_cache import cache, cached_response, invalidate_cached_response
+from auth import CachingJWTManager
+
 # Import auth routes
 from auth_routes import auth_bp
 # Import ML routes
@@ -24,7 +32,24 @@ CORS(app)
 app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-me")
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = 3600  # 1 hour
 app.config["JWT_REFRESH_TOKEN_EXPIRES"] = 2592000  # 30 days
-jwt = JWTManager(app)
+jwt = CachingJWTManager(app)
+
+# Configure response compression
+app.config["COMPRESS_MIMETYPES"] = ["application/json"]
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.config["COMPRESS_LEVEL"] = 5
+app.config["COMPRESS_BR_LEVEL"] = 5
+app.config["COMPRESS_MIN_SIZE"] = 1024
+# Compressing a stream would buffer it, so streamed responses are sent as is
+app.config["COMPRESS_STREAMS"] = False
+Compress(app)
+
+# Configure response cache
+cache.init_app(app, config={
+    "CACHE_TYPE": os.getenv("CACHE_TYPE", "RedisCache"),
+    "CACHE_REDIS_URL": os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"),
+    "CACHE_KEY_PREFIX": "hpms:"
+})
 
 # Configure Swagger
 swagger_config = {
@@ -70,52 +95,166 @@ template = {
 
 swagger = Swagger(app, config=swagger_config, template=template)
 
-# Database connection function
-def create_db_connection():
-    try:
-        connection = mysql.connector.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            user=os.getenv("DB_USER", "root"),
-            password=os.getenv("DB_PASSWORD", ""),
-            database=os.getenv("DB_NAME", "hospital_db")
-        )
-        return connection
-    except Error as e:
-        print(f"Error connecting to MySQL database: {e}")
-        return None
+try:
+    get_db_pool()
+except Error as e:
+    print(f"Error creating MySQL connection pool: {e}")
 
-# Custom JSON encoder to handle date/datetime objects
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        return super().default(obj)
+# Return each request's pooled connection when the request ends
+app.teardown_request(close_db)
 
-app.json_encoder = CustomJSONEncoder
+# Serialize JSON with orjson; dates and datetimes are encoded as ISO 8601
+app.json = OrjsonProvider(app)
 
 # Register blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(ml_bp, url_prefix='/api/ml')
 
 # Import auth functions
-from auth import role_required
+from auth import role_required, current_claims
+
+# Conditional GET support
+def fetch_version(version_query, params):
+    """
+    Run a cheap query whose result changes whenever the endpoint's data does.
+    
+    Args:
+        version_query (str): Query using named parameters from the route
+        params (dict): Route parameters
+        
+    Returns:
+        tuple: Version row, or None if unavailable
+    """
+    # A connection of its own, handed back before the handler runs, so a
+    # streamed response never holds it alongside the stream's connection
+    try:
+        with db_cursor() as (connection, cursor):
+            cursor.execute(version_query, params)
+            return cursor.fetchone()
+    except Error as e:
+        print(f"Error fetching data version: {e}")
+        return None
+
+def conditional_response(version_query=None):
+    """
+    Decorator adding an ETag and answering If-None-Match with 304.
+    
+    With a version query the ETag is derived from the data version, so a
+    matching request is answered before the endpoint runs its SQL. Without
+    one the ETag is a hash of the response body.
+    
+    Args:
+        version_query (str): Optional query returning the data version
+        
+    Returns:
+        Function: Decorated function with conditional GET support
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            etag = None
+            if version_query:
+                version = fetch_version(version_query, kwargs or None)
+                if version is not None and version[0] is not None:
+                    etag = hashlib.blake2b(
+                        repr((request.full_path, current_claims().get("role"), version)).encode('utf-8'),
+                        digest_size=16
+                    ).hexdigest()
+                    
+                    if request.if_none_match.contains(etag):
+                        response = app.response_class(status=304)
+                        response.set_etag(etag)
+                        response.headers['Cache-Control'] = 'private, max-age=5'
+                        return response
+            
+            response, status = fn(*args, **kwargs)
+            
+            if status == 200:
+                response.headers['Cache-Control'] = 'private, max-age=5'
+                if etag:
+                    response.set_etag(etag)
+                elif not response.is_streamed:
+                    response.add_etag()
+                    response.make_conditional(request)
+                    status = response.status_code
+            
+            return response, status
+        return wrapper
+    return decorator
+
+# Version queries used to build ETags
+PATIENTS_VERSION_QUERY = "SELECT MAX(updated_at), COUNT(*) FROM patients"
+
+# Child tables have no updated_at, so their row counts and latest ids stand in
+PATIENT_VERSION_QUERY = """
+SELECT 
+    p.updated_at,
+    (SELECT COUNT(*) FROM medical_history WHERE patient_id = p.patient_id),
+    (SELECT MAX(history_id) FROM medical_history WHERE patient_id = p.patient_id),
+    (SELECT COUNT(*) FROM vitals WHERE patient_id = p.patient_id),
+    (SELECT MAX(vital_id) FROM vitals WHERE patient_id = p.patient_id),
+    (SELECT COUNT(*) FROM medications WHERE patient_id = p.patient_id),
+    (SELECT MAX(medication_id) FROM medications WHERE patient_id = p.patient_id),
+    (SELECT COUNT(*) FROM appointments WHERE patient_id = p.patient_id),
+    (SELECT MAX(appointment_id) FROM appointments WHERE patient_id = p.patient_id),
+    (SELECT COUNT(*) FROM delivery_information WHERE patient_id = p.patient_id),
+    (SELECT MAX(delivery_id) FROM delivery_information WHERE patient_id = p.patient_id)
+FROM 
+    patients p
+WHERE 
+    p.patient_id = %(patient_id)s
+"""
+
+RISK_SUMMARY_VERSION_QUERY = "SELECT MAX(refreshed_at), COUNT(*) FROM patient_risk_summary"
+DEMOGRAPHICS_SUMMARY_VERSION_QUERY = "SELECT MAX(refreshed_at), COUNT(*) FROM patient_demographics_summary"
+
+# Health check body, encoded once at import time. A fresh Response is still
+# built per request because after_request hooks add headers to it.
+HEALTH_BODY = dumps({"status": "healthy", "message": "API is running"})
 
 # Health check endpoint
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """
     Health check endpoint
-    This endpoint checks if the API is running.
+    This endpoint checks if the API is running. It does not touch the database.
     ---
     responses:
       200:
         description: API is healthy
     """
-    return jsonify({"status": "healthy", "message": "API is running"}), 200
+    return app.response_class(HEALTH_BODY, status=200, mimetype='application/json')
+
+# Database health check endpoint
+@app.route('/api/healthz/db', methods=['GET'])
+def database_health_check():
+    """
+    Database health check endpoint
+    This endpoint checks that a pooled database connection can run a query.
+    ---
+    responses:
+      200:
+        description: Database is reachable
+      503:
+        description: Database is unavailable
+    """
+    connection = get_db()
+    if connection is None:
+        return jsonify({"status": "unhealthy", "message": "Database connection failed"}), 503
+    
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+        return jsonify({"status": "healthy", "message": "Database is reachable"}), 200
+    except Error as e:
+        return jsonify({"status": "unhealthy", "message": str(e)}), 503
 
 # Get all patients
 @app.route('/api/patients', methods=['GET'])
 @role_required(['admin', 'doctor', 'nurse', 'receptionist', 'data_analyst'])
+@conditional_response(version_query=PATIENTS_VERSION_QUERY)
+@cached_response(timeout=10, key_prefix='patients')
 def get_patients():
     """
     Get all patients
@@ -134,18 +273,35 @@ def get_patients():
         return jsonify({"error": "Database connection failed"}), 500
     
     try:
-        cursor = connection.cursor(dictionary=True)
+        # Unbuffered cursor so rows are streamed from MySQL in batches
+        cursor = connection.cursor(dictionary=True, buffered=False)
         cursor.execute("SELECT * FROM patients")
-        patients = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        return jsonify(patients), 200
     except Error as e:
+        connection.close()
         return jsonify({"error": str(e)}), 500
+    
+    # The stream closes the cursor and returns the connection to the pool
+    return app.response_class(
+        stream_json_rows(cursor, connection), mimetype='application/json'
+    ), 200
+
+# Queries for a patient's details, executed together as one multi-statement script
+PATIENT_DETAILS_QUERIES = [
+    ('patient', "SELECT * FROM patients WHERE patient_id = %s"),
+    ('medical_history',
+     "SELECT history_id, patient_id, condition_name, diagnosis_date, treatment, notes "
+     "FROM medical_history WHERE patient_id = %s"),
+    ('vitals', "SELECT * FROM vitals WHERE patient_id = %s ORDER BY recorded_at DESC"),
+    ('medications', "SELECT * FROM medications WHERE patient_id = %s"),
+    ('appointments', "SELECT * FROM appointments WHERE patient_id = %s ORDER BY appointment_date DESC"),
+    ('delivery_information', "SELECT * FROM delivery_information WHERE patient_id = %s")
+]
+PATIENT_DETAILS_SCRIPT = ";\n".join(query for _, query in PATIENT_DETAILS_QUERIES)
 
 # Get patient by ID
 @app.route('/api/patients/<patient_id>', methods=['GET'])
 @role_required(['admin', 'doctor', 'nurse', 'receptionist'])
+@conditional_response(version_query=PATIENT_VERSION_QUERY)
 def get_patient(patient_id):
     """
     Get patient by ID
@@ -167,51 +323,56 @@ def get_patient(patient_id):
       500:
         description: Database connection error
     """
-    connection = create_db_connection()
+    connection = get_db()
     if connection is None:
         return jsonify({"error": "Database connection failed"}), 500
     
     try:
         cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM patients WHERE patient_id = %s", (patient_id,))
-        patient = cursor.fetchone()
-        
-        if not patient:
-            cursor.close()
-            connection.close()
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Get medical history
-        cursor.execute("SELECT * FROM medical_history WHERE patient_id = %s", (patient_id,))
-        medical_history = cursor.fetchall()
-        patient['medical_history'] = medical_history
-        
-        # Get vitals
-        cursor.execute("SELECT * FROM vitals WHERE patient_id = %s ORDER BY recorded_at DESC", (patient_id,))
-        vitals = cursor.fetchall()
-        patient['vitals'] = vitals
         
-        # Get medications
-        cursor.execute("SELECT * FROM medications WHERE patient_id = %s", (patient_id,))
-        medications = cursor.fetchall()
-        patient['medications'] = medications
+        # Fetch the patient and all related records in a single round-trip
+        result_sets = {}
+        results = cursor.execute(
+            PATIENT_DETAILS_SCRIPT,
+            (patient_id,) * len(PATIENT_DETAILS_QUERIES),
+            multi=True
+        )
+        for (key, _), result in zip(PATIENT_DETAILS_QUERIES, results):
+            result_sets[key] = result.fetchall()
         
-        # Get appointments
-        cursor.execute("SELECT * FROM appointments WHERE patient_id = %s ORDER BY appointment_date DESC", (patient_id,))
-        appointments = cursor.fetchall()
-        patient['appointments'] = appointments
+        if not result_sets['patient']:
+            return jsonify({"error": "Patient not found"}), 404
         
-        # Get delivery information if available
-        cursor.execute("SELECT * FROM delivery_information WHERE patient_id = %s", (patient_id,))
-        delivery_info = cursor.fetchall()
-        patient['delivery_information'] = delivery_info
+        patient = result_sets.pop('patient')[0]
+        patient.update(result_sets)
         
-        cursor.close()
-        connection.close()
         return jsonify(patient), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
+# Insert statement shared by the single and batch patient endpoints
+INSERT_PATIENT_QUERY = """
+INSERT INTO patients (
+    patient_id, first_name, last_name, date_of_birth, gender, email, 
+    phone, address, city, state, zip_code, insurance_provider, insurance_id, 
+    emergency_contact_name, emergency_contact_phone
+) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+def generate_patient_id():
+    # Generate patient_id (in a real system, you might have a different approach)
+    return f"P{uuid.uuid4().hex[:8].upper()}"
+
+def patient_insert_values(patient_id, data):
+    """Build the INSERT_PATIENT_QUERY parameters from a dumped PatientIn."""
+    return (
+        patient_id, data['first_name'], data['last_name'], data['date_of_birth'],
+        data.get('gender'), data.get('email'), data.get('phone'),
+        data.get('address'), data.get('city'), data.get('state'),
+        data.get('zip_code'), data.get('insurance_provider'), data.get('insurance_id'),
+        data.get('emergency_contact_name'), data.get('emergency_contact_phone')
+    )
+
 # Add new patient
 @app.route('/api/patients', methods=['POST'])
 @role_required(['admin', 'doctor', 'nurse', 'receptionist'])
@@ -270,67 +431,116 @@ def add_patient():
       500:
         description: Database connection error
     """
-    connection = create_db_connection()
+    try:
+        data = PatientIn.model_validate(request.get_json()).model_dump()
+    except ValidationError as e:
+        return jsonify({"error": format_validation_error(e)}), 400
+    
+    connection = get_db()
     if connection is None:
         return jsonify({"error": "Database connection failed"}), 500
     
+    try:
+        cursor = connection.cursor()
+        
+        patient_id = generate_patient_id()
+        
+        cursor.execute(INSERT_PATIENT_QUERY, patient_insert_values(patient_id, data))
+        connection.commit()
+        
+        invalidate_cached_response('patients')
+        
+        return jsonify({
+            "message": "Patient added successfully",
+            "patient_id": patient_id
+        }), 201
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+
+# Add patients in bulk
+@app.route('/api/patients/batch', methods=['POST'])
+@role_required(['admin', 'doctor', 'nurse', 'receptionist'])
+def add_patients_batch():
+    """
+    Add patients in bulk
+    This endpoint adds a list of patients in a single batched INSERT.
+    ---
+    security:
+      - Bearer: []
+    parameters:
+      - name: patients
+        in: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - first_name
+              - last_name
+              - date_of_birth
+    responses:
+      201:
+        description: Patients created successfully
+      400:
+        description: Invalid request data
+      500:
+        description: Database connection error
+    """
     data = request.get_json()
     
-    # Validate required fields
-    required_fields = ['first_name', 'last_name', 'date_of_birth']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({"error": f"Missing required field: {field}"}), 400
-    
-    # Sanitize and validate inputs
-    if not isinstance(data['first_name'], str) or len(data['first_name']) > 100:
-        return jsonify({"error": "Invalid first_name"}), 400
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Request body must be a non-empty list of patients"}), 400
     
-    if not isinstance(data['last_name'], str) or len(data['last_name']) > 100:
-        return jsonify({"error": "Invalid last_name"}), 400
+    # Validate every patient before touching the database
+    patients = []
+    for index, patient in enumerate(data):
+        try:
+            patients.append(PatientIn.model_validate(patient).model_dump())
+        except ValidationError as e:
+            return jsonify({"error": f"Patient {index}: {format_validation_error(e)}"}), 400
     
-    # Validate date format
-    try:
-        datetime.strptime(data['date_of_birth'], '%Y-%m-%d')
-    except ValueError:
-        return jsonify({"error": "Invalid date_of_birth format. Use YYYY-MM-DD"}), 400
+    connection = get_db()
+    if connection is None:
+        return jsonify({"error": "Database connection failed"}), 500
     
     try:
         cursor = connection.cursor()
         
-        # Generate patient_id (in a real system, you might have a different approach)
-        import uuid
-        patient_id = f"P{uuid.uuid4().hex[:8].upper()}"
-        
-        # Insert into patients table
-        query = """
-        INSERT INTO patients (
-            patient_id, first_name, last_name, date_of_birth, gender, email, 
-            phone, address, city, state, zip_code, insurance_provider, insurance_id, 
-            emergency_contact_name, emergency_contact_phone
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        values = (
-            patient_id, data['first_name'], data['last_name'], data['date_of_birth'],
-            data.get('gender'), data.get('email'), data.get('phone'),
-            data.get('address'), data.get('city'), data.get('state'),
-            data.get('zip_code'), data.get('insurance_provider'), data.get('insurance_id'),
-            data.get('emergency_contact_name'), data.get('emergency_contact_phone')
-        )
+        patient_ids = [generate_patient_id() for _ in patients]
         
-        cursor.execute(query, values)
+        # executemany rewrites the INSERT into a single multi-row statement
+        cursor.executemany(
+            INSERT_PATIENT_QUERY,
+            [patient_insert_values(patient_id, patient) for patient_id, patient in zip(patient_ids, patients)]
+        )
         connection.commit()
         
-        cursor.close()
-        connection.close()
+        invalidate_cached_response('patients')
         
         return jsonify({
-            "message": "Patient added successfully",
-            "patient_id": patient_id
+            "message": "Patients added successfully",
+            "patient_ids": patient_ids
         }), 201
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
+# Columns update_patient may write, taken from the PatientUpdate schema
+UPDATABLE_PATIENT_COLUMNS = frozenset(PatientUpdate.model_fields)
+
+@lru_cache(maxsize=256)
+def build_update_patient_query(columns):
+    """
+    Build the UPDATE statement for a set of patient columns.
+    
+    Args:
+        columns (tuple): Sorted, whitelisted column names
+        
+    Returns:
+        str: Parameterized UPDATE statement
+    """
+    return f"UPDATE patients SET {', '.join(f'{column} = %s' for column in columns)} WHERE patient_id = %s"
+
 # Update patient
 @app.route('/api/patients/<patient_id>', methods=['PUT'])
 @role_required(['admin', 'doctor', 'nurse'])
@@ -392,63 +602,64 @@ def update_patient(patient_id):
       500:
         description: Database connection error
     """
-    connection = create_db_connection()
+    # Only fields sent by the client are updated; patient_id is not updatable
+    try:
+        data = PatientUpdate.model_validate(request.get_json()).model_dump(exclude_unset=True)
+    except ValidationError as e:
+        return jsonify({"error": format_validation_error(e)}), 400
+    
+    # Never interpolate a column name that is not whitelisted
+    columns = tuple(sorted(key for key in data if key in UPDATABLE_PATIENT_COLUMNS))
+    
+    if not columns:
+        return jsonify({"error": "No fields to update"}), 400
+    
+    # Add patient_id to values for WHERE clause
+    values = [data[column] for column in columns]
+    values.append(patient_id)
+    
+    connection = get_db()
     if connection is None:
         return jsonify({"error": "Database connection failed"}), 500
     
-    data = request.get_json()
-    
     try:
-        cursor = connection.cursor(dictionary=True)
-        
-        # Check if patient exists
-        cursor.execute("SELECT * FROM patients WHERE patient_id = %s", (patient_id,))
-        if not cursor.fetchone():
-            cursor.close()
-            connection.close()
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Sanitize and validate inputs
-        if 'first_name' in data and (not isinstance(data['first_name'], str) or len(data['first_name']) > 100):
-            return jsonify({"error": "Invalid first_name"}), 400
-        
-        if 'last_name' in data and (not isinstance(data['last_name'], str) or len(data['last_name']) > 100):
-            return jsonify({"error": "Invalid last_name"}), 400
-        
-        if 'date_of_birth' in data:
-            try:
-                datetime.strptime(data['date_of_birth'], '%Y-%m-%d')
-            except ValueError:
-                return jsonify({"error": "Invalid date_of_birth format. Use YYYY-MM-DD"}), 400
-        
-        # Build update query dynamically based on provided fields
-        update_fields = []
-        values = []
-        
-        for key, value in data.items():
-            if key != 'patient_id':  # Don't update the primary key
-                update_fields.append(f"{key} = %s")
-                values.append(value)
+        cursor = connection.cursor()
         
-        if not update_fields:
-            cursor.close()
-            connection.close()
-            return jsonify({"error": "No fields to update"}), 400
+        cursor.execute(build_update_patient_query(columns), values)
         
-        # Add patient_id to values for WHERE clause
-        values.append(patient_id)
+        # The pool uses FOUND_ROWS, so rowcount is the number of matched rows
+        if cursor.rowcount == 0:
+            return jsonify({"error": "Patient not found"}), 404
         
-        query = f"UPDATE patients SET {', '.join(update_fields)} WHERE patient_id = %s"
-        cursor.execute(query, values)
         connection.commit()
         
-        cursor.close()
-        connection.close()
+        invalidate_cached_response('patients')
         
         return jsonify({"message": "Patient updated successfully"}), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
+# Insert statement shared by the single and batch vitals endpoints
+INSERT_VITALS_QUERY = """
+INSERT INTO vitals (
+    patient_id, recorded_at, temperature, heart_rate, 
+    blood_pressure_systolic, blood_pressure_diastolic, 
+    respiratory_rate, oxygen_saturation, notes
+) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+def vitals_insert_values(patient_id, data):
+    """Build the INSERT_VITALS_QUERY parameters from a dumped VitalsIn."""
+    # Use current timestamp if not provided
+    recorded_at = data.get('recorded_at') or datetime.now()
+    
+    return (
+        patient_id, recorded_at, data.get('temperature'), data.get('heart_rate'),
+        data.get('blood_pressure_systolic'), data.get('blood_pressure_diastolic'),
+        data.get('respiratory_rate'), data.get('oxygen_saturation'),
+        data.get('notes')
+    )
+
 # Add vitals for a patient
 @app.route('/api/patients/<patient_id>/vitals', methods=['POST'])
 @role_required(['admin', 'doctor', 'nurse'])
@@ -498,92 +709,131 @@ def add_vitals(patient_id):
       500:
         description: Database connection error
     """
-    connection = create_db_connection()
+    try:
+        data = VitalsIn.model_validate(request.get_json()).model_dump()
+    except ValidationError as e:
+        return jsonify({"error": format_validation_error(e)}), 400
+    
+    connection = get_db()
     if connection is None:
         return jsonify({"error": "Database connection failed"}), 500
     
+    try:
+        cursor = connection.cursor()
+        
+        # Check if patient exists
+        cursor.execute("SELECT 1 FROM patients WHERE patient_id = %s LIMIT 1", (patient_id,))
+        if cursor.fetchone() is None:
+            return jsonify({"error": "Patient not found"}), 404
+        
+        # Insert vitals
+        cursor.execute(INSERT_VITALS_QUERY, vitals_insert_values(patient_id, data))
+        connection.commit()
+        
+        vital_id = cursor.lastrowid
+        
+        return jsonify({
+            "message": "Vitals added successfully",
+            "vital_id": vital_id
+        }), 201
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+
+# Add vitals for a patient in bulk
+@app.route('/api/patients/<patient_id>/vitals/batch', methods=['POST'])
+@role_required(['admin', 'doctor', 'nurse'])
+def add_vitals_batch(patient_id):
+    """
+    Add vitals for a patient in bulk
+    This endpoint adds a list of vitals records in a single batched INSERT.
+    ---
+    security:
+      - Bearer: []
+    parameters:
+      - name: patient_id
+        in: path
+        type: string
+        required: true
+        description: The ID of the patient
+      - name: vitals
+        in: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+    responses:
+      201:
+        description: Vitals added successfully
+      400:
+        description: Invalid request data
+      404:
+        description: Patient not found
+      500:
+        description: Database connection error
+    """
     data = request.get_json()
     
-    # Validate inputs
-    if 'temperature' in data and data['temperature'] is not None:
-        try:
-            data['temperature'] = float(data['temperature'])
-            if data['temperature'] < 30 or data['temperature'] > 45:
-                return jsonify({"error": "Temperature out of reasonable range (30-45°C)"}), 400
-        except ValueError:
-            return jsonify({"error": "Invalid temperature value"}), 400
-    
-    if 'heart_rate' in data and data['heart_rate'] is not None:
-        try:
-            data['heart_rate'] = int(data['heart_rate'])
-            if data['heart_rate'] < 30 or data['heart_rate'] > 220:
-                return jsonify({"error": "Heart rate out of reasonable range (30-220 bpm)"}), 400
-        except ValueError:
-            return jsonify({"error": "Invalid heart rate value"}), 400
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Request body must be a non-empty list of vitals"}), 400
     
-    if 'blood_pressure_systolic' in data and data['blood_pressure_systolic'] is not None:
+    # Validate every record before touching the database
+    records = []
+    for index, vitals in enumerate(data):
         try:
-            data['blood_pressure_systolic'] = int(data['blood_pressure_systolic'])
-            if data['blood_pressure_systolic'] < 70 or data['blood_pressure_systolic'] > 250:
-                return jsonify({"error": "Systolic blood pressure out of reasonable range (70-250 mmHg)"}), 400
-        except ValueError:
-            return jsonify({"error": "Invalid systolic blood pressure value"}), 400
+            records.append(VitalsIn.model_validate(vitals).model_dump())
+        except ValidationError as e:
+            return jsonify({"error": f"Vitals {index}: {format_validation_error(e)}"}), 400
     
-    if 'blood_pressure_diastolic' in data and data['blood_pressure_diastolic'] is not None:
-        try:
-            data['blood_pressure_diastolic'] = int(data['blood_pressure_diastolic'])
-            if data['blood_pressure_diastolic'] < 40 or data['blood_pressure_diastolic'] > 150:
-                return jsonify({"error": "Diastolic blood pressure out of reasonable range (40-150 mmHg)"}), 400
-        except ValueError:
-            return jsonify({"error": "Invalid diastolic blood pressure value"}), 400
+    connection = get_db()
+    if connection is None:
+        return jsonify({"error": "Database connection failed"}), 500
     
     try:
         cursor = connection.cursor()
         
         # Check if patient exists
-        cursor.execute("SELECT * FROM patients WHERE patient_id = %s", (patient_id,))
-        if not cursor.fetchone():
-            cursor.close()
-            connection.close()
+        cursor.execute("SELECT 1 FROM patients WHERE patient_id = %s LIMIT 1", (patient_id,))
+        if cursor.fetchone() is None:
             return jsonify({"error": "Patient not found"}), 404
         
-        # Insert vitals
-        query = """
-        INSERT INTO vitals (
-            patient_id, recorded_at, temperature, heart_rate, 
-            blood_pressure_systolic, blood_pressure_diastolic, 
-            respiratory_rate, oxygen_saturation, notes
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        
-        # Use current timestamp if not provided
-        recorded_at = data.get('recorded_at', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-        
-        values = (
-            patient_id, recorded_at, data.get('temperature'), data.get('heart_rate'),
-            data.get('blood_pressure_systolic'), data.get('blood_pressure_diastolic'),
-            data.get('respiratory_rate'), data.get('oxygen_saturation'),
-            data.get('notes')
+        # executemany rewrites the INSERT into a single multi-row statement
+        cursor.executemany(
+            INSERT_VITALS_QUERY,
+            [vitals_insert_values(patient_id, vitals) for vitals in records]
         )
-        
-        cursor.execute(query, values)
         connection.commit()
         
-        vital_id = cursor.lastrowid
-        
-        cursor.close()
-        connection.close()
-        
         return jsonify({
             "message": "Vitals added successfully",
-            "vital_id": vital_id
+            "count": len(records)
         }), 201
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
+# Analytics queries, built once at import time
+# Read from the summary table refreshed hourly by refresh_analytics_summaries()
+HIGH_RISK_PREGNANCIES_QUERY = """
+SELECT 
+    patient_id,
+    patient_name,
+    date_of_birth,
+    age,
+    blood_pressure_systolic,
+    blood_pressure_diastolic,
+    complications,
+    risk_category
+FROM 
+    patient_risk_summary
+ORDER BY 
+    risk_priority
+"""
+
 # Get high-risk pregnancies
 @app.route('/api/analytics/high-risk-pregnancies', methods=['GET'])
 @role_required(['admin', 'doctor', 'nurse', 'data_analyst'])
+@conditional_response(version_query=RISK_SUMMARY_VERSION_QUERY)
+@cached_response(timeout=60, key_prefix='high_risk_pregnancies')
 def high_risk_pregnancies():
     """
     Get high-risk pregnancies
@@ -597,64 +847,51 @@ def high_risk_pregnancies():
       500:
         description: Database connection error
     """
-    connection = create_db_connection()
+    connection = get_db()
     if connection is None:
         return jsonify({"error": "Database connection failed"}), 500
     
     try:
         cursor = connection.cursor(dictionary=True)
         
-        query = """
-        SELECT 
-            p.patient_id,
-            CONCAT(p.first_name, ' ', p.last_name) AS patient_name,
-            p.date_of_birth,
-            TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
-            v.blood_pressure_systolic,
-            v.blood_pressure_diastolic,
-            d.complications,
-            CASE
-                WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 THEN 'Age Risk'
-                WHEN v.blood_pressure_systolic > 140 OR v.blood_pressure_diastolic > 90 THEN 'Hypertension Risk'
-                WHEN d.complications IS NOT NULL AND d.complications != '' THEN 'Previous Complications'
-                ELSE 'Normal'
-            END AS risk_category
-        FROM 
-            patients p
-        LEFT JOIN 
-            vitals v ON p.patient_id = v.patient_id AND v.recorded_at = (
-                SELECT MAX(recorded_at) FROM vitals WHERE patient_id = p.patient_id
-            )
-        LEFT JOIN 
-            delivery_information d ON p.patient_id = d.patient_id
-        WHERE 
-            (TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 OR
-            v.blood_pressure_systolic > 140 OR 
-            v.blood_pressure_diastolic > 90 OR
-            (d.complications IS NOT NULL AND d.complications != ''))
-        ORDER BY 
-            CASE
-                WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 AND 
-                    (v.blood_pressure_systolic > 140 OR v.blood_pressure_diastolic > 90) THEN 1
-                WHEN v.blood_pressure_systolic > 140 OR v.blood_pressure_diastolic > 90 THEN 2
-                WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 THEN 3
-                ELSE 4
-            END
-        """
-        
-        cursor.execute(query)
+        cursor.execute(HIGH_RISK_PREGNANCIES_QUERY)
         results = cursor.fetchall()
         
-        cursor.close()
-        connection.close()
-        
         return jsonify(results), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
+MISSED_FOLLOW_UPS_QUERY = """
+SELECT 
+    p.patient_id,
+    p.patient_name,
+    p.phone,
+    p.email,
+    fv.visit_date AS last_visit_date,
+    fv.follow_up_date AS scheduled_follow_up,
+    DATEDIFF(CURDATE(), fv.follow_up_date) AS days_overdue
+FROM 
+    patients p
+JOIN 
+    follow_up_visits fv ON p.patient_id = fv.patient_id
+WHERE 
+    fv.follow_up_required = TRUE 
+    AND fv.follow_up_date < CURDATE()
+    AND NOT EXISTS (
+        SELECT 1 
+        FROM follow_up_visits fv2 
+        WHERE fv2.patient_id = p.patient_id 
+        AND fv2.visit_date > fv.follow_up_date
+    )
+ORDER BY 
+    days_overdue DESC
+"""
+
 # Get missed follow-ups
 @app.route('/api/analytics/missed-follow-ups', methods=['GET'])
 @role_required(['admin', 'doctor', 'nurse', 'receptionist', 'data_analyst'])
+@conditional_response()
+@cached_response(timeout=60, key_prefix='missed_follow_ups')
 def missed_follow_ups():
     """
     Get missed follow-ups
@@ -668,52 +905,40 @@ def missed_follow_ups():
       500:
         description: Database connection error
     """
-    connection = create_db_connection()
+    connection = get_db()
     if connection is None:
         return jsonify({"error": "Database connection failed"}), 500
     
     try:
         cursor = connection.cursor(dictionary=True)
         
-        query = """
-        SELECT 
-            p.patient_id,
-            CONCAT(p.first_name, ' ', p.last_name) AS patient_name,
-            p.phone,
-            p.email,
-            fv.visit_date AS last_visit_date,
-            fv.follow_up_date AS scheduled_follow_up,
-            DATEDIFF(CURDATE(), fv.follow_up_date) AS days_overdue
-        FROM 
-            patients p
-        JOIN 
-            follow_up_visits fv ON p.patient_id = fv.patient_id
-        WHERE 
-            fv.follow_up_required = TRUE 
-            AND fv.follow_up_date < CURDATE()
-            AND NOT EXISTS (
-                SELECT 1 
-                FROM follow_up_visits fv2 
-                WHERE fv2.patient_id = p.patient_id 
-                AND fv2.visit_date > fv.follow_up_date
-            )
-        ORDER BY 
-            days_overdue DESC
-        """
-        
-        cursor.execute(query)
+        cursor.execute(MISSED_FOLLOW_UPS_QUERY)
         results = cursor.fetchall()
         
-        cursor.close()
-        connection.close()
-        
         return jsonify(results), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
+# Read from the summary table refreshed hourly by refresh_analytics_summaries()
+DEMOGRAPHICS_QUERY = """
+SELECT 
+    age_group,
+    city,
+    state,
+    patient_count,
+    unique_conditions,
+    delivery_count
+FROM 
+    patient_demographics_summary
+ORDER BY 
+    state, city, age_group
+"""
+
 # Get patient demographics
 @app.route('/api/analytics/demographics', methods=['GET'])
 @role_required(['admin', 'doctor', 'data_analyst'])
+@conditional_response(version_query=DEMOGRAPHICS_SUMMARY_VERSION_QUERY)
+@cached_response(timeout=300, key_prefix='demographics')
 def patient_demographics():
     """
     Get patient demographics
@@ -727,48 +952,25 @@ def patient_demographics():
       500:
         description: Database connection error
     """
-    connection = create_db_connection()
+    connection = get_db()
     if connection is None:
         return jsonify({"error": "Database connection failed"}), 500
     
     try:
         cursor = connection.cursor(dictionary=True)
         
-        query = """
-        SELECT 
-            CASE 
-                WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) < 18 THEN 'Under 18'
-                WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) BETWEEN 18 AND 30 THEN '18-30'
-                WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) BETWEEN 31 AND 45 THEN '31-45'
-                WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) BETWEEN 46 AND 65 THEN '46-65'
-                ELSE 'Over 65'
-            END AS age_group,
-            p.city,
-            p.state,
-            COUNT(*) AS patient_count,
-            COUNT(DISTINCT m.condition_name) AS unique_conditions,
-            COUNT(DISTINCT d.delivery_id) AS delivery_count
-        FROM 
-            patients p
-        LEFT JOIN 
-            medical_history m ON p.patient_id = m.patient_id
-        LEFT JOIN 
-            delivery_information d ON p.patient_id = d.patient_id
-        GROUP BY 
-            age_group, p.city, p.state
-        ORDER BY 
-            p.state, p.city, age_group
-        """
-        
-        cursor.execute(query)
+        cursor.execute(DEMOGRAPHICS_QUERY)
         results = cursor.fetchall()
         
-        cursor.close()
-        connection.close()
-        
         return jsonify(results), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
+# Development server only; production runs under gunicorn (see gunicorn.conf.py)
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
+    app.run(
+        debug=os.getenv("DEBUG", "False") == "True",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "5000")),
+        threaded=True
+    ) 
\ No newline at end of file
@@ -7,12 +7,148 @@ for the Hospital Patient Management System.
 
 import bcrypt
 import datetime
-from flask import request, jsonify
+import hashlib
+import time
+from cachetools import TTLCache
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import request, jsonify, g
 from flask_jwt_extended import (
-    create_access_token, create_refresh_token, 
+    JWTManager, create_access_token, create_refresh_token, 
     jwt_required, get_jwt_identity, get_jwt
 )
 from functools import wraps
+from db import create_db_connection
+
+def current_claims():
+    """
+    Get the claims of the verified JWT for the current request.
+    
+    The claims are looked up once and kept on flask.g, so decorators and
+    handlers can share them without going back to the JWT extension.
+    
+    Returns:
+        dict: JWT claims
+    """
+    claims = g.get('_jwt_claims')
+    if claims is None:
+        claims = g._jwt_claims = get_jwt()
+    return claims
+
+# Decoded claims of recently verified tokens, keyed by a hash of the token
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "50000"))
+JWT_CACHE_TTL = int(os.getenv("JWT_CACHE_TTL", "300"))  # seconds
+
+# The claims cache overrides this private JWTManager method. flask-jwt-extended
+# is pinned in requirements.txt; this stops startup if an upgrade removes it.
+if not callable(getattr(JWTManager, '_decode_jwt_from_config', None)):
+    raise RuntimeError(
+        "flask_jwt_extended.JWTManager has no _decode_jwt_from_config; "
+        "CachingJWTManager needs the pinned flask-jwt-extended version"
+    )
+
+def _revoked_token_key(jti):
+    return f"revoked_token:{jti}"
+
+def access_token_lifetime(app):
+    """
+    Get the configured access token lifetime.
+    
+    Args:
+        app (Flask): App with JWT_ACCESS_TOKEN_EXPIRES set
+        
+    Returns:
+        int: Lifetime in seconds, or None if access tokens never expire
+    """
+    expires = app.config['JWT_ACCESS_TOKEN_EXPIRES']
+    if expires is False:
+        return None
+    if isinstance(expires, datetime.timedelta):
+        return int(expires.total_seconds())
+    return int(expires)
+
+class CachingJWTManager(JWTManager):
+    """
+    JWTManager that skips signature verification for recently seen tokens.
+    
+    Cached claims are only reused while the token is unexpired, and the
+    usual token type, blocklist and claims checks still run on every request.
+    Revoked tokens are kept in the shared Redis cache, so a logout applies
+    to every gunicorn worker.
+    """
+    
+    def __init__(self, app=None):
+        self._claims_cache = TTLCache(maxsize=JWT_CACHE_SIZE, ttl=JWT_CACHE_TTL)
+        self._revoked_tokens = None
+        self._revoked_token_ttl = None
+        self._cache_lock = threading.Lock()
+        super().__init__(app)
+        self.token_in_blocklist_loader(self._is_token_revoked)
+    
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        
+        # Logged-out access tokens are kept for the access token lifetime,
+        # so none of them becomes valid again while it is unexpired
+        self._revoked_token_ttl = access_token_lifetime(app)
+        self._revoked_tokens = TTLCache(
+            maxsize=JWT_CACHE_SIZE,
+            ttl=self._revoked_token_ttl if self._revoked_token_ttl is not None else float('inf')
+        )
+    
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # Cookie tokens need their CSRF value checked on every decode
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        
+        key = hashlib.blake2b(encoded_token.encode('utf-8'), digest_size=16).digest()
+        with self._cache_lock:
+            claims = self._claims_cache.get(key)
+        
+        if claims is not None and claims.get('exp', 0) > time.time():
+            return claims
+        
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        with self._cache_lock:
+            self._claims_cache[key] = claims
+        return claims
+    
+    def revoke_token(self, claims):
+        """
+        Reject a token for the rest of its lifetime in every worker.
+        
+        Args:
+            claims (dict): Claims of the token to revoke
+        """
+        # Imported here because response_cache imports this module
+        from response_cache import cache
+        
+        # Also kept locally, so this worker rejects the token even if Redis is down
+        with self._cache_lock:
+            self._revoked_tokens[claims['jti']] = True
+        
+        try:
+            # A timeout of 0 keeps the entry for tokens that never expire
+            cache.set(_revoked_token_key(claims['jti']), True, timeout=self._revoked_token_ttl or 0)
+        except Exception as e:
+            print(f"Error saving revoked token: {e}")
+    
+    def _is_token_revoked(self, jwt_header, jwt_payload):
+        from response_cache import cache
+        
+        with self._cache_lock:
+            if jwt_payload['jti'] in self._revoked_tokens:
+                return True
+        
+        try:
+            return cache.get(_revoked_token_key(jwt_payload['jti'])) is not None
+        except Exception as e:
+            print(f"Error reading revoked tokens: {e}")
+            return False
 
 # Role-based access control decorator
 def role_required(allowed_roles):
@@ -25,12 +161,14 @@ def role_required(allowed_roles):
     Returns:
         Function: Decorated function with role check
     """
+    allowed_roles = frozenset(allowed_roles)
+    
     def decorator(fn):
         @wraps(fn)
         @jwt_required()
         def wrapper(*args, **kwargs):
             # Get claims from JWT
-            claims = get_jwt()
+            claims = current_claims()
             
             # Check if user role is in allowed roles
             if claims.get("role") not in allowed_roles:
@@ -40,9 +178,80 @@ def role_required(allowed_roles):
         return wrapper
     return decorator
 
+# Argon2id parameters; tune per host so a hash takes roughly 100-250 ms
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", str(46 * 1024)))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+
+_password_hasher = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM
+)
+
+# Bounded pool of OS threads for password hashing; argon2 and bcrypt release
+# the GIL, so one thread per core lets hashes run in parallel. Token signing
+# is cheap and stays on the request worker.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("HASH_POOL_SIZE", str(os.cpu_count() or 4)))
+)
+
+def submit_to_hash_pool(fn, *args):
+    """
+    Start a CPU-heavy hashing function off the request worker.
+    
+    Under gevent the threading module is patched, so gevent's native
+    threadpool is used to get a real OS thread instead of a greenlet.
+    
+    Args:
+        fn (Function): Function to run
+        *args: Arguments for the function
+        
+    Returns:
+        Future-like object; call result() to wait for the return value
+    """
+    try:
+        from gevent import get_hub, monkey
+        if monkey.is_module_patched('threading'):
+            return get_hub().threadpool.spawn(fn, *args)
+    except ImportError:
+        pass
+    return _hash_pool.submit(fn, *args)
+
+def run_in_hash_pool(fn, *args):
+    """
+    Run a CPU-heavy hashing function off the request worker and wait for it.
+    
+    Args:
+        fn (Function): Function to run
+        *args: Arguments for the function
+        
+    Returns:
+        The function's return value
+    """
+    return submit_to_hash_pool(fn, *args).result()
+
+def _is_bcrypt_hash(stored_hash):
+    return stored_hash.startswith(('$2a$', '$2b$', '$2y$'))
+
+def _hash_password(password):
+    return _password_hasher.hash(password)
+
+def _verify_password(stored_hash, provided_password):
+    # Accounts created before the switch to Argon2id still have bcrypt hashes
+    if _is_bcrypt_hash(stored_hash):
+        return bcrypt.checkpw(
+            provided_password.encode('utf-8'), 
+            stored_hash.encode('utf-8')
+        )
+    try:
+        return _password_hasher.verify(stored_hash, provided_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
 def hash_password(password):
     """
-    Hash a password using bcrypt.
+    Hash a password using Argon2id.
     
     Args:
         password (str): Plain text password
@@ -50,14 +259,11 @@ def hash_password(password):
     Returns:
         str: Hashed password
     """
-    # Generate salt and hash password
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    return run_in_hash_pool(_hash_password, password)
 
 def verify_password(stored_hash, provided_password):
     """
-    Verify a password against its hash.
+    Verify a password against its Argon2id or legacy bcrypt hash.
     
     Args:
         stored_hash (str): Stored password hash
@@ -66,12 +272,44 @@ def verify_password(stored_hash, provided_password):
     Returns:
         bool: True if password matches, False otherwise
     """
-    return bcrypt.checkpw(
-        provided_password.encode('utf-8'), 
-        stored_hash.encode('utf-8')
-    )
+    return run_in_hash_pool(_verify_password, stored_hash, provided_password)
+
+# Hash checked when a login names no user, so that path costs the same
+_DUMMY_HASH = _password_hasher.hash(os.urandom(16).hex())
+
+def verify_dummy_password(provided_password):
+    """
+    Spend the same time as a real verification when no user was found.
+    
+    Keeps unknown and known usernames indistinguishable by response time.
+    
+    Args:
+        provided_password (str): Password from the login request
+        
+    Returns:
+        bool: Always False
+    """
+    verify_password(_DUMMY_HASH, provided_password)
+    return False
 
-def generate_tokens(user_id, username, role):
+def password_needs_rehash(stored_hash):
+    """
+    Check whether a verified hash should be replaced with a current one.
+    
+    Args:
+        stored_hash (str): Stored password hash
+        
+    Returns:
+        bool: True for bcrypt hashes and Argon2id hashes with outdated parameters
+    """
+    if _is_bcrypt_hash(stored_hash):
+        return True
+    try:
+        return _password_hasher.check_needs_rehash(stored_hash)
+    except InvalidHashError:
+        return True
+
+def generate_tokens(user_id, username, role, session_id=None):
     """
     Generate access and refresh tokens for a user.
     
@@ -79,6 +317,7 @@ def generate_tokens(user_id, username, role):
         user_id (int): User ID
         username (str): Username
         role (str): User role name
+        session_id (str): Login session the tokens belong to (optional)
         
     Returns:
         tuple: (access_token, refresh_token)
@@ -97,6 +336,9 @@ def generate_tokens(user_id, username, role):
         "role": role
     }
     
+    if session_id is not None:
+        additional_claims["sid"] = session_id
+    
     # Generate tokens
     access_token = create_access_token(
         identity=identity,
@@ -112,38 +354,234 @@ def generate_tokens(user_id, username, role):
     
     return access_token, refresh_token
 
-def log_user_activity(user_id, activity_type, details=None, connection=None):
+# role_id -> role_name; the roles table is small and rarely changes
+_ROLE_CACHE = {}
+
+def load_roles(connection):
     """
-    Log user activity for audit purposes.
+    Load the full roles table into the in-process role cache.
+    
+    Call again after roles are added or renamed.
     
     Args:
-        user_id (int): User ID
-        activity_type (str): Type of activity (login, view, create, update, delete)
-        details (str): Additional details about the activity
         connection: Database connection
+    """
+    cursor = connection.cursor()
+    cursor.execute("SELECT role_id, role_name FROM roles")
+    roles = dict(cursor.fetchall())
+    cursor.close()
+    
+    _ROLE_CACHE.clear()
+    _ROLE_CACHE.update(roles)
+
+def get_role_name(role_id, connection):
+    """
+    Get the name of a role from the role cache.
+    
+    The cache is (re)loaded on a miss, so roles added since the last load
+    are picked up without a restart.
+    
+    Args:
+        role_id (int): Role ID
+        connection: Database connection used if the cache must be loaded
         
     Returns:
-        bool: True if logged successfully, False otherwise
+        str: Role name, or 'unknown' if the role does not exist
     """
-    if not connection:
-        return False
+    if role_id not in _ROLE_CACHE:
+        load_roles(connection)
+    return _ROLE_CACHE.get(role_id, 'unknown')
+
+# Access tokens issued by /refresh, reused for repeated refreshes of a session.
+# Kept short so a reused token still has most of its lifetime left.
+REFRESH_REUSE_TTL = int(os.getenv("REFRESH_REUSE_TTL", "60"))  # seconds
+
+_refreshed_tokens = TTLCache(maxsize=10000, ttl=REFRESH_REUSE_TTL)
+_refreshed_tokens_lock = threading.Lock()
+
+def _refresh_key(identity, claims):
+    return (identity.get("user_id"), claims.get("role", "unknown"), claims.get("sid"))
+
+def refresh_access_token(identity, claims):
+    """
+    Issue an access token for a refresh, reusing a recently issued one.
+    
+    Args:
+        identity (dict): Identity of the refresh token
+        claims (dict): Claims of the refresh token
         
-    try:
-        cursor = connection.cursor()
+    Returns:
+        str: Access token
+    """
+    key = _refresh_key(identity, claims)
+    
+    # Held while signing so concurrent refreshes of a session sign only once
+    with _refreshed_tokens_lock:
+        access_token = _refreshed_tokens.get(key)
+        if access_token is None:
+            additional_claims = {"role": key[1]}
+            
+            # Keep the new access token tied to the same login session
+            if key[2] is not None:
+                additional_claims["sid"] = key[2]
+            
+            access_token = create_access_token(
+                identity=identity,
+                additional_claims=additional_claims
+            )
+            _refreshed_tokens[key] = access_token
+    
+    return access_token
+
+def forget_refreshed_token(identity, claims):
+    """
+    Stop reusing the refreshed access token of a session, e.g. on logout.
+    
+    Args:
+        identity (dict): Identity of the token
+        claims (dict): Claims of the token
+    """
+    with _refreshed_tokens_lock:
+        _refreshed_tokens.pop(_refresh_key(identity, claims), None)
+
+# Writes queued for the background writer, as (query, params) pairs
+WRITE_BEHIND_QUEUE_SIZE = 10000
+WRITE_BEHIND_BATCH_SIZE = 1000
+WRITE_BEHIND_FLUSH_INTERVAL = 0.2  # seconds
+
+INSERT_ACTIVITY_LOG_QUERY = """
+INSERT INTO user_activity_log (
+    user_id, activity_type, details, ip_address, created_at
+) VALUES (%s, %s, %s, %s, %s)
+"""
+
+UPDATE_LAST_LOGIN_QUERY = "UPDATE users SET last_login = %s WHERE user_id = %s"
+
+INSERT_SESSION_QUERY = """
+INSERT INTO user_sessions (
+    session_id, user_id, ip_address, user_agent, expires_at
+) VALUES (%s, %s, %s, %s, DATE_ADD(CURRENT_TIMESTAMP, INTERVAL 30 DAY))
+"""
+
+_write_queue = queue.Queue(maxsize=WRITE_BEHIND_QUEUE_SIZE)
+_writer = None
+_writer_lock = threading.Lock()
+
+def _write_batches():
+    """Drain the write-behind queue, committing each statement of a batch separately."""
+    while True:
+        batch = [_write_queue.get()]
         
-        query = """
-        INSERT INTO user_activity_log (
-            user_id, activity_type, details, ip_address
-        ) VALUES (%s, %s, %s, %s)
-        """
+        # Collect whatever else arrives within the flush interval
+        try:
+            while len(batch) < WRITE_BEHIND_BATCH_SIZE:
+                batch.append(_write_queue.get(timeout=WRITE_BEHIND_FLUSH_INTERVAL))
+        except queue.Empty:
+            pass
         
-        ip_address = request.remote_addr
+        # Group by statement so each runs as a single executemany
+        params_by_query = {}
+        for query, params in batch:
+            params_by_query.setdefault(query, []).append(params)
         
-        cursor.execute(query, (user_id, activity_type, details, ip_address))
-        connection.commit()
+        connection = create_db_connection()
+        if connection is None:
+            print(f"Error writing queued updates: dropped {len(batch)} entries")
+            continue
         
-        cursor.close()
+        # One transaction per statement, so a failing row only loses the
+        # entries queued alongside it for the same statement
+        try:
+            cursor = connection.cursor()
+            for query, rows in params_by_query.items():
+                try:
+                    cursor.executemany(query, rows)
+                    connection.commit()
+                except Exception as e:
+                    connection.rollback()
+                    print(f"Error writing queued updates: dropped {len(rows)} entries: {e}")
+            cursor.close()
+        except Exception as e:
+            print(f"Error writing queued updates: {e}")
+        finally:
+            connection.close()
+
+def _ensure_writer():
+    # Started lazily so each gunicorn worker runs its own writer after fork
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(
+                    target=_write_batches,
+                    name='write-behind-writer',
+                    daemon=True
+                )
+                _writer.start()
+
+def _enqueue_write(query, params):
+    _ensure_writer()
+    
+    try:
+        _write_queue.put_nowait((query, params))
         return True
-    except Exception as e:
-        print(f"Error logging user activity: {e}")
-        return False 
\ No newline at end of file
+    except queue.Full:
+        print("Error writing queued updates: queue is full")
+        return False
+
+def log_user_activity(user_id, activity_type, details=None):
+    """
+    Log user activity for audit purposes.
+    
+    The entry is queued and written in the background, so the request does
+    not wait on the INSERT.
+    
+    Args:
+        user_id (int): User ID
+        activity_type (str): Type of activity (login, view, create, update, delete)
+        details (str): Additional details about the activity
+        
+    Returns:
+        bool: True if queued successfully, False if the queue is full
+    """
+    return _enqueue_write(INSERT_ACTIVITY_LOG_QUERY, (
+        user_id, activity_type, details,
+        request.remote_addr, datetime.datetime.now()
+    ))
+
+def record_last_login(user_id):
+    """
+    Record a successful login time for a user.
+    
+    The UPDATE is queued and written in the background, so logins do not
+    wait on the lock for the user's row.
+    
+    Args:
+        user_id (int): User ID
+        
+    Returns:
+        bool: True if queued successfully, False if the queue is full
+    """
+    return _enqueue_write(
+        UPDATE_LAST_LOGIN_QUERY, (datetime.datetime.now(), user_id)
+    )
+
+def record_session(session_id, user_id, connection):
+    """
+    Record a new login session for the current request's client.
+    
+    Unlike the audit log, the INSERT is written and committed on the
+    request's connection. Logout deletes the row synchronously, so a queued
+    INSERT could land after it and leave an orphaned session behind.
+    
+    Args:
+        session_id (str): Session ID carried in the tokens
+        user_id (int): User ID
+        connection: Database connection
+    """
+    cursor = connection.cursor()
+    cursor.execute(INSERT_SESSION_QUERY, (
+        session_id, user_id, request.remote_addr, request.user_agent.string
+    ))
+    connection.commit()
+    cursor.close()
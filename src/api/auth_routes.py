@@ -4,17 +4,57 @@ Authentication Routes
 This module defines the authentication endpoints for the API.
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import (
     jwt_required, get_jwt_identity, get_jwt,
-    create_access_token, set_access_cookies
+    set_access_cookies
+)
+import secrets
+from mysql.connector import IntegrityError, errorcode
+from pydantic import ValidationError
+from schemas import RegisterIn, LoginIn, format_validation_error
+from db import get_db
+from auth import (
+    hash_password, verify_password, verify_dummy_password,
+    generate_tokens, log_user_activity, record_last_login, record_session,
+    get_role_name,
+    password_needs_rehash, refresh_access_token, forget_refreshed_token
 )
-import datetime
-from .auth import hash_password, verify_password, generate_tokens, log_user_activity
 
 # Create Blueprint
 auth_bp = Blueprint('auth', __name__)
 
+# User lookups joined with the role name, so each needs a single round-trip.
+# username and email are UNIQUE, so both lookups are single index probes.
+# Disabled accounts return no row, so their passwords are never verified.
+LOGIN_QUERY = """
+SELECT 
+    u.user_id, u.username, u.password_hash, u.first_name, u.last_name,
+    r.role_name
+FROM users u
+LEFT JOIN roles r ON r.role_id = u.role_id
+WHERE u.{column} = %s AND u.is_active = TRUE
+"""
+LOGIN_BY_EMAIL_QUERY = LOGIN_QUERY.format(column='email')
+LOGIN_BY_USERNAME_QUERY = LOGIN_QUERY.format(column='username')
+
+INSERT_USER_QUERY = """
+INSERT INTO users (
+    username, email, password_hash, first_name, last_name, role_id
+) VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+CURRENT_USER_QUERY = """
+SELECT 
+    u.user_id, u.username, u.email, u.first_name, u.last_name, u.role_id,
+    u.is_active, u.last_login, COALESCE(r.role_name, 'unknown') AS role
+FROM users u
+LEFT JOIN roles r ON r.role_id = u.role_id
+WHERE u.user_id = %s
+"""
+
+UPDATE_PASSWORD_HASH_QUERY = "UPDATE users SET password_hash = %s WHERE user_id = %s"
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """
@@ -31,68 +71,50 @@ def register():
     Returns:
         JSON: User information and tokens
     """
-    from app import create_db_connection
-    
-    data = request.get_json()
+    try:
+        data = RegisterIn.model_validate(request.get_json()).model_dump()
+    except ValidationError as e:
+        return jsonify({"error": format_validation_error(e)}), 400
     
-    # Validate required fields
-    required_fields = ['username', 'email', 'password', 'first_name', 'last_name']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({"error": f"Missing required field: {field}"}), 400
+    # Login treats any identifier containing '@' as an email address
+    if '@' in data['username']:
+        return jsonify({"error": "Username must not contain '@'"}), 400
     
-    connection = create_db_connection()
+    connection = get_db()
     if connection is None:
         return jsonify({"error": "Database connection failed"}), 500
     
     try:
-        cursor = connection.cursor(dictionary=True)
-        
-        # Check if username or email already exists
-        cursor.execute(
-            "SELECT * FROM users WHERE username = %s OR email = %s", 
-            (data['username'], data['email'])
-        )
-        
-        if cursor.fetchone():
-            cursor.close()
-            connection.close()
-            return jsonify({"error": "Username or email already exists"}), 409
-        
-        # Hash password
         hashed_password = hash_password(data['password'])
         
-        # Default role to receptionist if not specified
-        role_id = data.get('role_id', 4)  # 4 is receptionist in our default roles
+        role_id = data['role_id']
         
-        # Insert user
-        insert_query = """
-        INSERT INTO users (
-            username, email, password_hash, first_name, last_name, role_id
-        ) VALUES (%s, %s, %s, %s, %s, %s)
-        """
+        cursor = connection.cursor()
         
-        cursor.execute(
-            insert_query, 
-            (
-                data['username'], 
-                data['email'], 
-                hashed_password, 
-                data['first_name'], 
-                data['last_name'], 
-                role_id
+        # Insert user; the UNIQUE username and email columns reject duplicates
+        try:
+            cursor.execute(
+                INSERT_USER_QUERY, 
+                (
+                    data['username'], 
+                    data['email'], 
+                    hashed_password, 
+                    data['first_name'], 
+                    data['last_name'], 
+                    role_id
+                )
             )
-        )
+        except IntegrityError as e:
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                return jsonify({"error": "Username or email already exists"}), 409
+            raise
         
         connection.commit()
         
         # Get the inserted user
         user_id = cursor.lastrowid
         
-        # Get role name
-        cursor.execute("SELECT role_name FROM roles WHERE role_id = %s", (role_id,))
-        role = cursor.fetchone()
-        role_name = role['role_name'] if role else 'unknown'
+        role_name = get_role_name(role_id, connection)
         
         # Generate tokens
         access_token, refresh_token = generate_tokens(
@@ -103,13 +125,9 @@ def register():
         log_user_activity(
             user_id, 
             "register", 
-            f"User registered with username {data['username']}", 
-            connection
+            f"User registered with username {data['username']}"
         )
         
-        cursor.close()
-        connection.close()
-        
         return jsonify({
             "message": "User registered successfully",
             "user_id": user_id,
@@ -134,99 +152,69 @@ def login():
     Returns:
         JSON: User information and tokens
     """
-    from app import create_db_connection
-    
-    data = request.get_json()
-    
-    # Validate required fields
-    if 'username' not in data or 'password' not in data:
-        return jsonify({"error": "Username and password are required"}), 400
+    try:
+        data = LoginIn.model_validate(request.get_json()).model_dump()
+    except ValidationError as e:
+        return jsonify({"error": format_validation_error(e)}), 400
     
-    connection = create_db_connection()
+    connection = get_db()
     if connection is None:
         return jsonify({"error": "Database connection failed"}), 500
     
     try:
         cursor = connection.cursor(dictionary=True)
         
-        # Check if username is actually an email
-        is_email = '@' in data['username']
-        
-        if is_email:
-            cursor.execute(
-                "SELECT * FROM users WHERE email = %s", 
-                (data['username'],)
-            )
-        else:
-            cursor.execute(
-                "SELECT * FROM users WHERE username = %s", 
-                (data['username'],)
-            )
+        # Fetch the user together with their role name in one query.
+        # New usernames cannot contain '@', so this picks the right unique
+        # index; accounts registered before that rule fall back to username.
+        user = None
+        if '@' in data['username']:
+            cursor.execute(LOGIN_BY_EMAIL_QUERY, (data['username'],))
+            user = cursor.fetchone()
+        if user is None:
+            cursor.execute(LOGIN_BY_USERNAME_QUERY, (data['username'],))
+            user = cursor.fetchone()
+        cursor.close()
         
-        user = cursor.fetchone()
+        if user is None:
+            verify_dummy_password(data['password'])
+            return jsonify({"error": "Invalid username or password"}), 401
         
-        if not user or not verify_password(user['password_hash'], data['password']):
-            cursor.close()
-            connection.close()
+        if not verify_password(user['password_hash'], data['password']):
             return jsonify({"error": "Invalid username or password"}), 401
         
-        # Check if user is active
-        if not user['is_active']:
-            cursor.close()
-            connection.close()
-            return jsonify({"error": "Account is disabled"}), 403
+        role_name = user['role_name'] or 'unknown'
         
-        # Get role name
-        cursor.execute(
-            "SELECT role_name FROM roles WHERE role_id = %s", 
-            (user['role_id'],)
-        )
-        role = cursor.fetchone()
-        role_name = role['role_name'] if role else 'unknown'
+        # Random session ID, carried in the tokens as the "sid" claim
+        session_id = secrets.token_urlsafe(16)
         
         # Generate tokens
         access_token, refresh_token = generate_tokens(
-            user['user_id'], user['username'], role_name
+            user['user_id'], user['username'], role_name, session_id
         )
         
-        # Update last login
-        cursor.execute(
-            "UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE user_id = %s", 
-            (user['user_id'],)
-        )
+        # Update last login in the background
+        record_last_login(user['user_id'])
         
         # Create session
-        session_id = access_token
-        expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=30)
+        record_session(session_id, user['user_id'], connection)
         
-        cursor.execute(
-            """
-            INSERT INTO user_sessions (
-                session_id, user_id, ip_address, user_agent, expires_at
-            ) VALUES (%s, %s, %s, %s, %s)
-            """,
-            (
-                session_id, 
-                user['user_id'], 
-                request.remote_addr, 
-                request.user_agent.string, 
-                expires_at
+        # Upgrade bcrypt or outdated Argon2id hashes now that we have the password
+        if password_needs_rehash(user['password_hash']):
+            cursor = connection.cursor()
+            cursor.execute(
+                UPDATE_PASSWORD_HASH_QUERY,
+                (hash_password(data['password']), user['user_id'])
             )
-        )
-        
-        connection.commit()
+            connection.commit()
         
         # Log activity
         log_user_activity(
             user['user_id'], 
             "login", 
-            f"User logged in from {request.remote_addr}", 
-            connection
+            f"User logged in from {request.remote_addr}"
         )
         
-        cursor.close()
-        connection.close()
-        
         return jsonify({
             "message": "Login successful",
             "user_id": user['user_id'],
@@ -253,11 +241,8 @@ def refresh():
     identity = get_jwt_identity()
     claims = get_jwt()
     
-    # Create new access token
-    access_token = create_access_token(
-        identity=identity,
-        additional_claims={"role": claims.get("role", "unknown")}
-    )
+    # Repeated refreshes of a session within a short window share one token
+    access_token = refresh_access_token(identity, claims)
     
     return jsonify({
         "access_token": access_token
@@ -272,37 +257,35 @@ def logout():
     Returns:
         JSON: Success message
     """
-    from app import create_db_connection
-    
     identity = get_jwt_identity()
     token = get_jwt()
     
-    connection = create_db_connection()
+    connection = get_db()
     if connection is None:
         return jsonify({"error": "Database connection failed"}), 500
     
     try:
         cursor = connection.cursor()
         
-        # Delete session
+        # Delete only the session this token belongs to
         cursor.execute(
-            "DELETE FROM user_sessions WHERE user_id = %s", 
-            (identity.get('user_id'),)
+            "DELETE FROM user_sessions WHERE session_id = %s", 
+            (token.get('sid'),)
         )
         
         connection.commit()
         
+        # Stop accepting this access token or handing it out again
+        current_app.extensions['flask-jwt-extended'].revoke_token(token)
+        forget_refreshed_token(identity, token)
+        
         # Log activity
         log_user_activity(
             identity.get('user_id'), 
             "logout", 
-            "User logged out", 
-            connection
+            "User logged out"
         )
         
-        cursor.close()
-        connection.close()
-        
         return jsonify({
             "message": "Logout successful"
         }), 200
@@ -319,40 +302,22 @@ def get_current_user():
     Returns:
         JSON: User information
     """
-    from app import create_db_connection
-    
     identity = get_jwt_identity()
     
-    connection = create_db_connection()
+    connection = get_db()
     if connection is None:
         return jsonify({"error": "Database connection failed"}), 500
     
     try:
         cursor = connection.cursor(dictionary=True)
         
-        cursor.execute(
-            "SELECT user_id, username, email, first_name, last_name, role_id, is_active, last_login FROM users WHERE user_id = %s", 
-            (identity.get('user_id'),)
-        )
+        cursor.execute(CURRENT_USER_QUERY, (identity.get('user_id'),))
         
         user = cursor.fetchone()
         
         if not user:
-            cursor.close()
-            connection.close()
             return jsonify({"error": "User not found"}), 404
         
-        # Get role name
-        cursor.execute(
-            "SELECT role_name FROM roles WHERE role_id = %s", 
-            (user['role_id'],)
-        )
-        role = cursor.fetchone()
-        user['role'] = role['role_name'] if role else 'unknown'
-        
-        cursor.close()
-        connection.close()
-        
         return jsonify(user), 200
         
     except Exception as e:
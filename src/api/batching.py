@@ -0,0 +1,172 @@
+"""
+Prediction Batching Module
+
+This module coalesces concurrent single-patient predictions into one
+predict_batch call per model, so the fixed per-call cost of feature
+assembly and model dispatch is paid once for a group of requests.
+Results are cached so repeated feature values skip the model entirely.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from cachetools import LRUCache
+
+# Largest group of requests scored together, and how long the first request
+# of a group waits for others to arrive
+PREDICT_BATCH_SIZE = int(os.getenv("PREDICT_BATCH_SIZE", "32"))
+PREDICT_BATCH_WAIT = float(os.getenv("PREDICT_BATCH_WAIT", "0.005"))  # seconds
+
+# Recent results kept per model, keyed by feature values
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+
+def run_off_hub(fn, *args):
+    """
+    Run a CPU-bound function without stalling other requests, and wait for it.
+
+    Under gevent the caller is a greenlet, so the function is handed to
+    gevent's native threadpool; ONNX Runtime and sklearn release the GIL,
+    so the hub keeps serving I/O while the model runs. Without gevent the
+    function runs in place.
+
+    Args:
+        fn (Function): Function to run
+        *args: Arguments for the function
+
+    Returns:
+        The function's return value
+    """
+    try:
+        from gevent import get_hub, monkey
+        if monkey.is_module_patched('threading'):
+            return get_hub().threadpool.spawn(fn, *args).get()
+    except ImportError:
+        pass
+    return fn(*args)
+
+class PredictionBatcher:
+    """
+    Queue single predictions for a model and score them in batches.
+
+    A background worker takes the first queued request, collects whatever
+    else arrives within the batch window, and runs the whole group through
+    the model's predict_batch. Under load the queue fills while a batch is
+    scored, so groups grow with traffic.
+
+    Results are cached by feature values. A prediction depends on nothing
+    else, so a cached result stays correct until the model is retrained,
+    whatever table the features came from.
+    """
+
+    def __init__(self, model, max_batch_size=PREDICT_BATCH_SIZE, max_wait=PREDICT_BATCH_WAIT,
+                 cache_size=PREDICTION_CACHE_SIZE):
+        """
+        Initialize the batcher.
+
+        Args:
+            model: Model with predict and predict_batch methods
+            max_batch_size (int): Largest number of requests scored together
+            max_wait (float): Seconds to wait for a batch to fill
+            cache_size (int): Number of results kept for repeated features
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._cache = LRUCache(maxsize=cache_size)
+        self._cache_lock = threading.Lock()
+
+    def predict(self, patient_data):
+        """
+        Predict for one patient as part of the next batch.
+
+        Args:
+            patient_data (dict): Patient's data with features
+
+        Returns:
+            dict: Same result as the model's predict
+        """
+        key = self._cache_key(patient_data)
+        if key is not None:
+            with self._cache_lock:
+                cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((patient_data, future))
+        result = future.result()
+
+        if key is not None and 'error' not in result:
+            with self._cache_lock:
+                self._cache[key] = result
+        return result
+
+    def clear_cache(self):
+        """Forget cached results, e.g. after the model has been retrained."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _cache_key(self, patient_data):
+        # None for payloads that are not dicts or hold unhashable values
+        try:
+            key = tuple(patient_data.get(name) for name in self.model.features)
+            hash(key)
+        except (AttributeError, TypeError):
+            return None
+        return key
+
+    def _ensure_worker(self):
+        # Started lazily so each gunicorn worker runs its own batcher after fork
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run,
+                        name='prediction-batcher',
+                        daemon=True
+                    )
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+
+            # Collect whatever else arrives within the batch window
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            try:
+                self._score(batch)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _score(self, batch):
+        result = run_off_hub(
+            self.model.predict_batch, [patient_data for patient_data, _ in batch]
+        )
+
+        if 'error' not in result:
+            for (_, future), prediction in zip(batch, result['predictions']):
+                future.set_result(prediction)
+            return
+
+        # One malformed payload fails the whole batch, so score each request
+        # alone to keep the others' results and give each its own error
+        for patient_data, future in batch:
+            future.set_result(run_off_hub(self.model.predict, patient_data))
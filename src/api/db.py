@@ -0,0 +1,110 @@
+"""
+Database Connection Module
+
+This module owns the MySQL connection pool and the helpers routes use to
+borrow connections from it.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from flask import g
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
+from mysql.connector.constants import ClientFlag
+
+# Database connection pool, created once per process and shared by all requests
+db_pool = None
+
+# How long a request waits for a free pooled connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))  # seconds
+DB_POOL_RETRY_INTERVAL = 0.01  # seconds
+
+def get_db_pool():
+    global db_pool
+    if db_pool is None:
+        db_pool = pooling.MySQLConnectionPool(
+            pool_name="hpms",
+            pool_size=int(os.getenv("DB_POOL_SIZE", "16")),
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", "root"),
+            password=os.getenv("DB_PASSWORD", ""),
+            database=os.getenv("DB_NAME", "hospital_db"),
+            # The pure-Python driver cooperates with gevent's patched sockets
+            use_pure=os.getenv("DB_USE_PURE", "True") == "True",
+            # Report matched rather than changed rows for UPDATE statements
+            client_flags=[ClientFlag.FOUND_ROWS],
+            # Requests share one connection, so discard rows a query left unread
+            consume_results=True
+        )
+    return db_pool
+
+# Database connection function
+# Calling close() on the returned connection hands it back to the pool.
+def create_db_connection():
+    deadline = time.monotonic() + DB_POOL_TIMEOUT
+    while True:
+        try:
+            return get_db_pool().get_connection()
+        except PoolError as e:
+            # Every connection is checked out; wait for one to be handed back
+            # rather than failing requests during a burst
+            if time.monotonic() < deadline:
+                time.sleep(DB_POOL_RETRY_INTERVAL)
+                continue
+            print(f"Error connecting to MySQL database: {e}")
+            return None
+        except Error as e:
+            print(f"Error connecting to MySQL database: {e}")
+            return None
+
+@contextmanager
+def db_cursor(**cursor_kwargs):
+    """
+    Borrow a pooled connection and cursor for a block of work.
+    
+    The cursor is closed and the connection handed back to the pool when the
+    block exits, including on exceptions, so the connection is free again
+    before any slow work that follows the block.
+    
+    Args:
+        **cursor_kwargs: Arguments for connection.cursor()
+        
+    Yields:
+        tuple: (connection, cursor)
+        
+    Raises:
+        Error: If no connection could be obtained
+    """
+    connection = create_db_connection()
+    if connection is None:
+        raise Error(msg="Database connection failed")
+    
+    try:
+        cursor = connection.cursor(**cursor_kwargs)
+        try:
+            yield connection, cursor
+        finally:
+            cursor.close()
+    finally:
+        connection.close()
+
+def get_db():
+    """
+    Get the pooled connection for the current request.
+    
+    The connection is acquired on first use and returned to the pool by
+    close_db when the request is torn down.
+    
+    Returns:
+        Connection from the pool, or None if the database is unavailable
+    """
+    if 'db' not in g:
+        g.db = create_db_connection()
+    return g.db
+
+def close_db(exc):
+    """Return the request's connection to the pool; registered on teardown."""
+    connection = g.pop('db', None)
+    if connection is not None:
+        connection.close()
@@ -0,0 +1,30 @@
+"""
+Gunicorn Configuration
+
+Production server settings for the Hospital Patient Management System API.
+Every endpoint waits on MySQL, so gevent workers are used to keep many
+requests in flight per worker while queries run.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}"
+
+# The gevent worker monkey-patches the standard library before the app is
+# imported, so the pure-Python MySQL driver yields while waiting on queries.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+
+# The app is imported after fork so each worker builds its own MySQL
+# connection pool instead of sharing sockets with the master process.
+preload_app = False
+
+timeout = 30
+
+# Keep client connections open between dashboard refreshes
+keepalive = 30
@@ -11,41 +11,497 @@ These models add predictive capabilities to the existing analytics dashboard.
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.compose import ColumnTransformer
+
+# Use oneDAL-accelerated random forests when Intel's extension is installed.
+# Patching must happen before RandomForestClassifier is imported.
+try:
+    from sklearnex import patch_sklearn
+    patch_sklearn('random_forest_classifier', verbose=False)
+except ImportError:
+    patch_sklearn = None
+
+from sklearn import config_context
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingRegressor
+from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import GridSearchCV, train_test_split
 from sklearn.metrics import classification_report, mean_squared_error, roc_auc_score
 import joblib
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
 import os
-import mysql.connector
+import threading
+from itertools import chain
 from mysql.connector import Error
 from dotenv import load_dotenv
+from db import db_cursor
+
+# ONNX export and inference are optional; predictions fall back to sklearn
+try:
+    import onnxruntime
+    from skl2onnx import to_onnx, update_registered_converter
+    
+    if patch_sklearn is not None:
+        from skl2onnx.common.shape_calculator import calculate_linear_classifier_output_shapes
+        from skl2onnx.operator_converters.random_forest import convert_sklearn_random_forest_classifier
+        
+        # The patched forest keeps sklearn's trees in estimators_, so it
+        # converts like a regular forest once skl2onnx knows the class
+        update_registered_converter(
+            RandomForestClassifier, 'SklearnexRandomForestClassifier',
+            calculate_linear_classifier_output_shapes,
+            convert_sklearn_random_forest_classifier,
+            options={'zipmap': [True, False, 'columns'], 'nocl': [True, False]}
+        )
+except ImportError:
+    onnxruntime = None
 
 # Load environment variables
 load_dotenv()
 
-def create_db_connection():
+# Threads per ONNX Runtime session. Predictions are mostly single rows and
+# every gunicorn worker holds its own sessions, so one thread avoids both
+# thread-pool dispatch overhead and CPU oversubscription.
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "1"))
+
+# Feature columns, in the order the numeric models are trained on
+PREGNANCY_FEATURES = [
+    'age', 'temperature', 'heart_rate', 'blood_pressure_systolic',
+    'blood_pressure_diastolic', 'respiratory_rate', 'oxygen_saturation',
+    'has_hypertension', 'has_diabetes', 'has_asthma'
+]
+FOLLOWUP_FEATURES = [
+    'age', 'gender_male', 'gender_female', 'has_address', 'has_phone',
+    'has_email', 'has_insurance', 'days_between_visits'
+]
+VITALS_FEATURES = [
+    'age_at_recording', 'prev_temperature', 'prev_heart_rate',
+    'prev_bp_systolic', 'prev_bp_diastolic',
+    'prev_respiratory_rate', 'prev_oxygen_saturation'
+]
+
+def with_gender_flags(patient_data):
+    """
+    Add the follow-up model's gender flags to a payload that only has gender.
+    
+    The model reads gender one-hot encoded as gender_male and gender_female,
+    the way the feature queries produce it. Clients of the original API send
+    gender ('Male', 'Female', ...) instead, so the flags are derived from it
+    exactly as the queries do.
+    
+    Args:
+        patient_data (dict): Patient's data with features
+    
+    Returns:
+        dict: Payload with both flags, or None if it has neither gender nor both flags
+    """
+    if not isinstance(patient_data, dict):
+        return None
+    if 'gender_male' in patient_data and 'gender_female' in patient_data:
+        return patient_data
+    if 'gender' not in patient_data:
+        return None
+    
+    gender = patient_data['gender']
+    return dict(patient_data, gender_male=int(gender == 'Male'), gender_female=int(gender == 'Female'))
+
+# Query to get features and target for pregnancy risk model
+PREGNANCY_TRAINING_QUERY = """
+SELECT 
+    TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
+    v.temperature,
+    v.heart_rate,
+    v.blood_pressure_systolic,
+    v.blood_pressure_diastolic,
+    v.respiratory_rate,
+    v.oxygen_saturation,
+    c.has_hypertension,
+    c.has_diabetes,
+    c.has_asthma,
+    CASE
+        WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 
+            OR v.blood_pressure_systolic > 140 
+            OR v.blood_pressure_diastolic > 90 
+            OR EXISTS (
+                SELECT 1 FROM delivery_information d
+                WHERE d.patient_id = p.patient_id AND d.complications != ''
+            )
+            OR c.has_hypertension = 1
+            OR c.has_diabetes = 1
+        THEN 1
+        ELSE 0
+    END AS high_risk
+FROM 
+    patients p
+LEFT JOIN 
+    vitals v ON p.patient_id = v.patient_id AND v.recorded_at = (
+        SELECT MAX(recorded_at) FROM vitals WHERE patient_id = p.patient_id
+    )
+LEFT JOIN 
+    patient_conditions c ON p.patient_id = c.patient_id
+WHERE 
+    p.gender = 'Female'
+"""
+
+# Query to get features and target for follow-up prediction model
+FOLLOWUP_TRAINING_QUERY = """
+SELECT 
+    TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
+    CASE WHEN p.gender = 'Male' THEN 1 ELSE 0 END AS gender_male,
+    CASE WHEN p.gender = 'Female' THEN 1 ELSE 0 END AS gender_female,
+    p.contact_flags & 1 AS has_address,
+    (p.contact_flags >> 1) & 1 AS has_phone,
+    (p.contact_flags >> 2) & 1 AS has_email,
+    (p.contact_flags >> 3) & 1 AS has_insurance,
+    DATEDIFF(fv.follow_up_date, fv.visit_date) AS days_between_visits,
+    CASE 
+        WHEN fv.follow_up_required = TRUE 
+        AND fv.follow_up_date < CURDATE()
+        AND NOT EXISTS (
+            SELECT 1 
+            FROM follow_up_visits fv2 
+            WHERE fv2.patient_id = p.patient_id 
+            AND fv2.visit_date > fv.follow_up_date
+        ) THEN 1
+        ELSE 0
+    END AS missed_followup
+FROM 
+    patients p
+JOIN 
+    follow_up_visits fv ON p.patient_id = fv.patient_id
+"""
+
+# Query to get sequential vitals data for predictions
+VITALS_TRAINING_QUERY = """
+SELECT 
+    TIMESTAMPDIFF(YEAR, p.date_of_birth, v.recorded_at) AS age_at_recording,
+    v.temperature,
+    v.heart_rate,
+    v.blood_pressure_systolic,
+    v.blood_pressure_diastolic,
+    v.respiratory_rate,
+    v.oxygen_saturation,
+    LAG(v.temperature) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_temperature,
+    LAG(v.heart_rate) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_heart_rate,
+    LAG(v.blood_pressure_systolic) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_bp_systolic,
+    LAG(v.blood_pressure_diastolic) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_bp_diastolic,
+    LAG(v.respiratory_rate) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_respiratory_rate,
+    LAG(v.oxygen_saturation) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_oxygen_saturation
+FROM 
+    patients p
+JOIN 
+    vitals v ON p.patient_id = v.patient_id
+"""
+
+# Score cut-offs, ascending, and the label of each band they delimit
+PREGNANCY_RISK_THRESHOLDS = np.array([0.3, 0.7])
+PREGNANCY_RISK_LABELS = np.array(['Low Risk', 'Medium Risk', 'High Risk'])
+FOLLOWUP_MISS_THRESHOLDS = np.array([0.3, 0.6])
+FOLLOWUP_MISS_LABELS = np.array(['High Compliance', 'Medium Compliance', 'Low Compliance'])
+BP_SYSTOLIC_THRESHOLDS = np.array([120, 130, 140])
+BP_SYSTOLIC_LABELS = np.array(['Normal', 'Elevated', 'Hypertension Stage 1', 'Hypertension Stage 2'])
+
+def bin_scores(scores, thresholds, labels):
+    """
+    Label scores by the band they fall in, without a Python loop or branches.
+    
+    A score equal to a threshold belongs to the band above it.
+    
+    Args:
+        scores (float or numpy.ndarray): Model scores
+        thresholds (numpy.ndarray): Ascending band boundaries
+        labels (numpy.ndarray): One label per band, len(thresholds) + 1
+        
+    Returns:
+        numpy.ndarray: Label per score, or a single label for a scalar score
+    """
+    return labels[np.searchsorted(thresholds, scores, side='right')]
+
+def fetch_feature_frames(queries):
+    """
+    Run queries whose columns are all numeric and load each as float32.
+    
+    Rows go straight into one NumPy array, so the DataFrame holds no
+    per-cell Python objects and needs no dtype inference. Every feature
+    fits in float32, which is also what the trees and ONNX Runtime use
+    internally, so no float64 copy is ever made. One connection is
+    borrowed from the API's pool for all queries and handed back once
+    rows are read.
+    
+    Args:
+        queries (list): SQL queries
+        
+    Returns:
+        list: One DataFrame per query; NULLs become NaN
+        
+    Raises:
+        Error: If the database is unavailable or a query fails
+    """
+    frames = []
+    with db_cursor() as (connection, cursor):
+        for query in queries:
+            cursor.execute(query)
+            columns = cursor.column_names
+            values = np.array(cursor.fetchall(), dtype=np.float32).reshape(-1, len(columns))
+            frames.append(pd.DataFrame(values, columns=columns))
+    return frames
+
+def fetch_feature_frame(query):
+    """
+    Run a query whose columns are all numeric and load it as float32.
+    
+    Args:
+        query (str): SQL query
+        
+    Returns:
+        DataFrame: Query result; NULLs become NaN
+        
+    Raises:
+        Error: If the database is unavailable or the query fails
+    """
+    return fetch_feature_frames([query])[0]
+
+def feature_array(patient_data, features, dtype=np.float32):
     """
-    Create a connection to the MySQL database.
+    Build a one-row feature matrix from a patient's data.
     
+    Args:
+        patient_data (dict): Patient's data with features
+        features (list): Feature names in model order
+        dtype: NumPy dtype of the matrix
+        
     Returns:
-        mysql.connector.connection_cext.CMySQLConnection: Database connection
+        numpy.ndarray: Array of shape (1, len(features)); missing values are NaN
+    """
+    # NumPy stores None as NaN in float arrays, so values need no checks
+    return np.fromiter(
+        map(patient_data.get, features), dtype=dtype, count=len(features)
+    ).reshape(1, -1)
+
+def feature_matrix(rows, features, dtype=np.float32):
+    """
+    Build a feature matrix from several patients' data.
+    
+    Args:
+        rows (list or numpy.ndarray): Patients' data with features, or a
+            matrix already in feature order, which is used as is
+        features (list): Feature names in model order
+        dtype: NumPy dtype of the matrix
+        
+    Returns:
+        numpy.ndarray: Array of shape (len(rows), len(features)); missing values are NaN
+    """
+    if isinstance(rows, np.ndarray):
+        return rows.astype(dtype, copy=False)
+    
+    # One flat pass straight into the array, with no per-row lists
+    return np.fromiter(
+        chain.from_iterable(map(row.get, features) for row in rows),
+        dtype=dtype, count=len(rows) * len(features)
+    ).reshape(len(rows), len(features))
+
+# Depth of the random forests. Shallow trees are enough for these mostly
+# threshold-like features and keep predictions and files small.
+FOREST_MAX_DEPTH = 8
+
+# Picking the depth by cross-validation fits each forest 13 times instead of
+# once, so it only runs when asked for
+TUNE_FOREST_DEPTH = os.getenv("TUNE_FOREST_DEPTH", "False") == "True"
+FOREST_MAX_DEPTHS = [6, 8, 10, 12]
+
+# Cores used to fit a random forest. Predictions score single rows or small
+# batches, where joblib's dispatch costs more than it saves, so fitted
+# forests are switched to one core before they are saved or served.
+FOREST_FIT_JOBS = int(os.getenv("FOREST_FIT_JOBS", str(os.cpu_count() or 1)))
+
+def serve_single_threaded(model):
+    """
+    Make a fitted pipeline's final estimator predict on one core.
+    
+    Args:
+        model (Pipeline): Fitted pipeline
+        
+    Returns:
+        Pipeline: The same pipeline
+    """
+    estimator = model.steps[-1][1]
+    if 'n_jobs' in estimator.get_params():
+        estimator.set_params(n_jobs=1)
+    return model
+
+def fit_forest(model, X_train, y_train):
+    """
+    Fit a random forest pipeline, picking max_depth by 3-fold cross-validation
+    when TUNE_FOREST_DEPTH is set.
+    
+    Args:
+        model (Pipeline): Pipeline whose last step is named 'classifier'
+        X_train (numpy.ndarray): Training features
+        y_train: Training labels
+        
+    Returns:
+        Pipeline: The fitted pipeline, set to predict on one core
+    """
+    if not TUNE_FOREST_DEPTH:
+        return serve_single_threaded(model.fit(X_train, y_train))
+    
+    search = GridSearchCV(
+        model, {'classifier__max_depth': FOREST_MAX_DEPTHS}, cv=3, scoring='roc_auc'
+    )
+    search.fit(X_train, y_train)
+    print(f"Selected max_depth={search.best_params_['classifier__max_depth']}")
+    return serve_single_threaded(search.best_estimator_)
+
+def inline_preprocessing(model):
+    """
+    Extract the fitted imputer and scaler parameters of a classifier pipeline.
+    
+    Args:
+        model (Pipeline): Pipeline with a 'preprocessor' step of imputer and scaler
+        
+    Returns:
+        tuple: Fill values, means and scales as float32 arrays, or None if the
+            pipeline is built differently, such as one saved by an older version
     """
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            user=os.getenv("DB_USER", "root"),
-            password=os.getenv("DB_PASSWORD", ""),
-            database=os.getenv("DB_NAME", "hospital_db")
+        steps = model.named_steps['preprocessor'].named_steps
+        imputer, scaler = steps['imputer'], steps['scaler']
+    except (AttributeError, KeyError):
+        return None
+    
+    if not isinstance(imputer, SimpleImputer) or not isinstance(scaler, StandardScaler):
+        return None
+    
+    return (
+        imputer.statistics_.astype(np.float32),
+        scaler.mean_.astype(np.float32),
+        scaler.scale_.astype(np.float32)
+    )
+
+def apply_preprocessing(X, preprocessing):
+    """
+    Impute and scale a feature matrix with extracted pipeline parameters.
+    
+    Args:
+        X (numpy.ndarray): Feature matrix; missing values are NaN
+        preprocessing (tuple): Parameters from inline_preprocessing
+        
+    Returns:
+        numpy.ndarray: Matrix ready for the pipeline's final estimator
+    """
+    fill, mean, scale = preprocessing
+    return (np.where(np.isnan(X), fill, X) - mean) / scale
+
+def export_onnx(model, X_sample, onnx_path):
+    """
+    Convert a fitted pipeline to ONNX for fast single-row inference.
+    
+    Args:
+        model (Pipeline): Fitted sklearn pipeline
+        X_sample (numpy.ndarray): Training rows used to infer the input type
+        onnx_path (str): Destination file
+        
+    Returns:
+        bool: True if the model was exported, False otherwise
+    """
+    if onnxruntime is None:
+        return False
+    
+    try:
+        # Classifiers return probabilities as a plain tensor, not a list of dicts
+        options = {'zipmap': False} if hasattr(model, 'predict_proba') else None
+        onx = to_onnx(model, X_sample.astype(np.float32, copy=False), target_opset=15, options=options)
+        
+        # Write then rename, so other workers never load a half-written file
+        tmp_path = f"{onnx_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(onx.SerializeToString())
+        os.replace(tmp_path, onnx_path)
+        return True
+    except Exception as e:
+        print(f"Error exporting model to ONNX: {e}")
+        return False
+
+def load_onnx_session(onnx_path):
+    """
+    Load an exported model into an ONNX Runtime session.
+    
+    Args:
+        onnx_path (str): Path of the exported model
+        
+    Returns:
+        onnxruntime.InferenceSession: Session, or None if unavailable
+    """
+    if onnxruntime is None or not os.path.exists(onnx_path):
+        return None
+    
+    try:
+        # Tree ensembles run as native TreeEnsemble kernels; full graph
+        # optimization also fuses the imputer and scaler nodes ahead of them
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+        options.inter_op_num_threads = 1
+        return onnxruntime.InferenceSession(
+            onnx_path, sess_options=options, providers=["CPUExecutionProvider"]
         )
-        return connection
-    except Error as e:
-        print(f"Error connecting to MySQL database: {e}")
+    except Exception as e:
+        print(f"Error loading ONNX model: {e}")
         return None
 
+# Saved models already loaded in this process, keyed by model path, so
+# every model instance shares one copy instead of unpickling its own
+_loaded_models = {}
+_loaded_models_lock = threading.Lock()
+
+def load_saved_model(model_path, onnx_path, steps):
+    """
+    Load a saved model and its ONNX session, at most once per process.
+    
+    Files saved by older versions hold DataFrame pipelines with different
+    steps, which neither the ONNX nor the inline sklearn prediction path can
+    run. Those are treated as missing, so the model is retrained.
+    
+    Args:
+        model_path (str): Path of the joblib model
+        onnx_path (str): Path of the exported ONNX model
+        steps (list): Step names the current pipeline is built with
+        
+    Returns:
+        tuple: (model, session), or (None, None) if no usable model has been saved
+    """
+    with _loaded_models_lock:
+        if model_path not in _loaded_models:
+            if not os.path.exists(model_path):
+                return None, None
+            model = joblib.load(model_path)
+            
+            # Current models are fit on arrays, so they carry no column names
+            if (not isinstance(model, Pipeline) or list(model.named_steps) != steps
+                    or hasattr(model, 'feature_names_in_')):
+                print(f"Warning: {model_path} has an unexpected format and will be retrained")
+                return None, None
+            
+            # Files saved before forests were switched to one core after fitting
+            serve_single_threaded(model)
+            _loaded_models[model_path] = (model, load_onnx_session(onnx_path))
+        return _loaded_models[model_path]
+
+def onnx_feed(session, X):
+    """
+    Build the ONNX Runtime feed for a feature matrix.
+    
+    Args:
+        session (onnxruntime.InferenceSession): Model session
+        X (numpy.ndarray): Feature matrix
+        
+    Returns:
+        dict: Input name to the matrix as C-contiguous float32
+    """
+    # A strided view, such as a column slice, would be copied inside the run
+    return {session.get_inputs()[0].name: np.ascontiguousarray(X, dtype=np.float32)}
+
 class PregnancyRiskModel:
     """
     Model to predict high-risk pregnancies based on patient data.
@@ -54,150 +510,119 @@ class PregnancyRiskModel:
     def __init__(self):
         """Initialize the pregnancy risk prediction model."""
         self.model = None
+        self.features = PREGNANCY_FEATURES
+        self.training_query = PREGNANCY_TRAINING_QUERY
+        self.session = None
+        self.preprocessing = None
         self.model_path = os.path.join(os.path.dirname(__file__), 'models', 'pregnancy_risk_model.joblib')
+        self.onnx_path = os.path.join(os.path.dirname(__file__), 'models', 'pregnancy_risk_model.onnx')
         
         # Create models directory if it doesn't exist
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
         
+        # Serializes the first load or training across request threads
+        self._lock = threading.Lock()
+        
+        # Guards the fitted model, session and preprocessing, which a
+        # retrain replaces together while predictions read them
+        self._fitted_lock = threading.Lock()
+        
         # Load the model if it exists
-        if os.path.exists(self.model_path):
-            self.load_model()
+        self.load_model()
     
-    def get_training_data(self):
+    def get_training_data(self, df=None):
         """
         Fetch training data from the database.
         
+        Args:
+            df (DataFrame): Result of the training query, if already fetched
+            
         Returns:
             tuple: Features DataFrame (X) and target Series (y)
         """
-        connection = create_db_connection()
-        if not connection:
-            return None, None
-        
         try:
-            # Query to get features and target for pregnancy risk model
-            query = """
-            SELECT 
-                TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
-                v.temperature,
-                v.heart_rate,
-                v.blood_pressure_systolic,
-                v.blood_pressure_diastolic,
-                v.respiratory_rate,
-                v.oxygen_saturation,
-                CASE WHEN m.condition_name LIKE '%hypertension%' THEN 1 ELSE 0 END AS has_hypertension,
-                CASE WHEN m.condition_name LIKE '%diabetes%' THEN 1 ELSE 0 END AS has_diabetes,
-                CASE WHEN m.condition_name LIKE '%asthma%' THEN 1 ELSE 0 END AS has_asthma,
-                CASE
-                    WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 
-                        OR v.blood_pressure_systolic > 140 
-                        OR v.blood_pressure_diastolic > 90 
-                        OR d.complications IS NOT NULL AND d.complications != ''
-                        OR m.condition_name LIKE '%hypertension%'
-                        OR m.condition_name LIKE '%diabetes%'
-                    THEN 1
-                    ELSE 0
-                END AS high_risk
-            FROM 
-                patients p
-            LEFT JOIN 
-                vitals v ON p.patient_id = v.patient_id AND v.recorded_at = (
-                    SELECT MAX(recorded_at) FROM vitals WHERE patient_id = p.patient_id
-                )
-            LEFT JOIN 
-                medical_history m ON p.patient_id = m.patient_id
-            LEFT JOIN 
-                delivery_information d ON p.patient_id = d.patient_id
-            WHERE 
-                p.gender = 'Female'
-            """
-            
-            # Fetch data
-            df = pd.read_sql(query, connection)
-            
-            # Close connection
-            connection.close()
-            
-            # Handle missing values
-            df = df.fillna({
-                'temperature': df['temperature'].median(),
-                'heart_rate': df['heart_rate'].median(),
-                'blood_pressure_systolic': df['blood_pressure_systolic'].median(),
-                'blood_pressure_diastolic': df['blood_pressure_diastolic'].median(),
-                'respiratory_rate': df['respiratory_rate'].median(),
-                'oxygen_saturation': df['oxygen_saturation'].median(),
+            # Fetch data, unless it was already read for this model
+            if df is None:
+                df = fetch_feature_frame(self.training_query)
+            
+            # Handle missing values; vitals medians are computed in one call
+            vitals_columns = [
+                'temperature', 'heart_rate', 'blood_pressure_systolic',
+                'blood_pressure_diastolic', 'respiratory_rate', 'oxygen_saturation'
+            ]
+            fill_values = df[vitals_columns].median().to_dict()
+            fill_values.update({
                 'has_hypertension': 0,
                 'has_diabetes': 0,
                 'has_asthma': 0
             })
+            df = df.fillna(fill_values)
             
             # Split features and target
-            X = df.drop('high_risk', axis=1)
+            X = df[self.features]
             y = df['high_risk']
             
             return X, y
             
         except Error as e:
             print(f"Error getting training data: {e}")
-            if connection:
-                connection.close()
             return None, None
     
-    def train(self):
+    def train(self, df=None, n_jobs=FOREST_FIT_JOBS):
         """
         Train the pregnancy risk prediction model.
         
+        Args:
+            df (DataFrame): Result of the training query, if already fetched
+            n_jobs (int): Cores to fit with; lower it when fitting several models at once
+            
         Returns:
             bool: True if training was successful, False otherwise
         """
         # Get training data
-        X, y = self.get_training_data()
+        X, y = self.get_training_data(df)
         
         if X is None or len(X) < 10:  # Need at least some samples to train
             print("Not enough training data available.")
             return False
         
         try:
-            # Define numeric features
-            numeric_features = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
-            
-            # Create preprocessing pipeline
-            numeric_transformer = Pipeline(steps=[
+            # Every feature is numeric, so no column transformer is needed
+            preprocessor = Pipeline(steps=[
                 ('imputer', SimpleImputer(strategy='median')),
                 ('scaler', StandardScaler())
             ])
             
-            preprocessor = ColumnTransformer(
-                transformers=[
-                    ('num', numeric_transformer, numeric_features)
-                ],
-                remainder='passthrough'
-            )
-            
-            # Create model pipeline
-            self.model = Pipeline(steps=[
+            # Create model pipeline. It is built and fitted locally and only
+            # swapped in once ready, since training runs while requests are served.
+            model = Pipeline(steps=[
                 ('preprocessor', preprocessor),
-                ('classifier', RandomForestClassifier(n_estimators=100, random_state=42))
+                ('classifier', RandomForestClassifier(
+                    n_estimators=30, max_depth=FOREST_MAX_DEPTH, min_samples_leaf=20, random_state=42, n_jobs=n_jobs
+                ))
             ])
             
-            # Split the data
+            # Split the data; fitting on arrays lets predict skip DataFrames
             X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
+                X.to_numpy(dtype=np.float32), y, test_size=0.2, random_state=42, stratify=y
             )
             
             # Train the model
-            self.model.fit(X_train, y_train)
+            model = fit_forest(model, X_train, y_train)
+            preprocessing = inline_preprocessing(model)
             
             # Evaluate the model
-            y_pred = self.model.predict(X_test)
-            y_prob = self.model.predict_proba(X_test)[:, 1]
+            y_pred = model.predict(X_test)
+            y_prob = model.predict_proba(X_test)[:, 1]
             
             print("Pregnancy Risk Model Evaluation:")
             print(classification_report(y_test, y_pred))
             print(f"ROC AUC Score: {roc_auc_score(y_test, y_prob):.4f}")
             
-            # Save the model
-            self.save_model()
+            # Save the model, then swap it in together with its session
+            session = self.save_model(model, X_train)
+            with self._fitted_lock:
+                self.model, self.session, self.preprocessing = model, session, preprocessing
             
             return True
             
@@ -215,13 +640,7 @@ class PregnancyRiskModel:
         Returns:
             dict: Prediction results with risk probability and category
         """
-        if self.model is None:
-            if not os.path.exists(self.model_path):
-                self.train()
-            else:
-                self.load_model()
-                
-        if self.model is None:
+        if not self._ensure_model():
             return {
                 'error': 'Model not available',
                 'risk_probability': None,
@@ -229,19 +648,10 @@ class PregnancyRiskModel:
             }
         
         try:
-            # Convert to DataFrame
-            df = pd.DataFrame([patient_data])
-            
-            # Make prediction
-            risk_prob = self.model.predict_proba(df)[0, 1]
+            risk_prob = self._predict_scores(feature_array(patient_data, self.features))[0]
             
             # Determine risk category
-            if risk_prob < 0.3:
-                risk_category = 'Low Risk'
-            elif risk_prob < 0.7:
-                risk_category = 'Medium Risk'
-            else:
-                risk_category = 'High Risk'
+            risk_category = str(bin_scores(risk_prob, PREGNANCY_RISK_THRESHOLDS, PREGNANCY_RISK_LABELS))
             
             return {
                 'risk_probability': float(risk_prob),
@@ -256,17 +666,98 @@ class PregnancyRiskModel:
                 'risk_category': 'Unknown'
             }
     
-    def save_model(self):
-        """Save the model to a file."""
-        if self.model is not None:
-            joblib.dump(self.model, self.model_path)
-            print(f"Pregnancy risk model saved to {self.model_path}")
+    def _ensure_model(self):
+        # Load the saved model, or train one if none has been saved yet.
+        # Re-checked under the lock so racing requests do the work once.
+        if self.model is None:
+            with self._lock:
+                if self.model is None:
+                    self.load_model()
+                if self.model is None:
+                    self.train()
+        return self.model is not None
+    
+    def _predict_scores(self, X):
+        """Risk probabilities for a feature matrix, via ONNX Runtime when available."""
+        with self._fitted_lock:
+            model, session, preprocessing = self.model, self.session, self.preprocessing
+        
+        if session is not None:
+            return session.run(None, onnx_feed(session, X))[1][:, 1]
+        
+        # Preprocess inline and call the forest directly, skipping the
+        # pipeline's per-step input validation. The imputed matrix has no
+        # NaNs, so sklearn's finiteness scan is skipped too.
+        X = apply_preprocessing(X, preprocessing)
+        with config_context(assume_finite=True):
+            return model.named_steps['classifier'].predict_proba(X)[:, 1]
+    
+    def predict_batch(self, patients):
+        """
+        Predict pregnancy risk for several patients with one model call.
+        
+        Args:
+            patients (list or numpy.ndarray): Each patient's data with features,
+                or a matrix in feature order
+            
+        Returns:
+            dict: 'predictions' in input order, or 'error'
+        """
+        if not self._ensure_model():
+            return {'error': 'Model not available'}
+        
+        try:
+            risk_probs = self._predict_scores(feature_matrix(patients, self.features))
+            risk_categories = bin_scores(risk_probs, PREGNANCY_RISK_THRESHOLDS, PREGNANCY_RISK_LABELS)
+            
+            return {
+                'predictions': [
+                    {'risk_probability': value, 'risk_category': label}
+                    for value, label in zip(risk_probs.tolist(), risk_categories.tolist())
+                ]
+            }
+            
+        except Exception as e:
+            print(f"Error predicting pregnancy risk: {e}")
+            return {'error': str(e)}
+    
+    def save_model(self, model, X_sample=None):
+        """
+        Save a fitted model to a file, plus an ONNX copy used for predictions.
+        
+        Args:
+            model (Pipeline): Fitted pipeline
+            X_sample (numpy.ndarray): Training rows used to infer the ONNX input type
+        
+        Returns:
+            onnxruntime.InferenceSession: Session for the ONNX copy, or None
+        """
+        joblib.dump(model, self.model_path)
+        print(f"Pregnancy risk model saved to {self.model_path}")
+        
+        session = None
+        if X_sample is not None and export_onnx(model, X_sample, self.onnx_path):
+            session = load_onnx_session(self.onnx_path)
+        
+        with _loaded_models_lock:
+            _loaded_models[self.model_path] = (model, session)
+        return session
     
     def load_model(self):
         """Load the model from a file."""
-        if os.path.exists(self.model_path):
-            self.model = joblib.load(self.model_path)
-            print(f"Pregnancy risk model loaded from {self.model_path}")
+        model, session = load_saved_model(self.model_path, self.onnx_path, ['preprocessor', 'classifier'])
+        if model is None:
+            return
+        
+        # Older files hold a different pipeline; leave those to be retrained
+        preprocessing = inline_preprocessing(model)
+        if preprocessing is None:
+            print(f"Warning: {self.model_path} has an unexpected format and will be retrained")
+            return
+        
+        with self._fitted_lock:
+            self.model, self.session, self.preprocessing = model, session, preprocessing
+        print(f"Pregnancy risk model loaded from {self.model_path}")
 
 class FollowUpPredictionModel:
     """
@@ -276,136 +767,106 @@ class FollowUpPredictionModel:
     def __init__(self):
         """Initialize the follow-up prediction model."""
         self.model = None
+        self.features = FOLLOWUP_FEATURES
+        self.training_query = FOLLOWUP_TRAINING_QUERY
+        self.session = None
+        self.preprocessing = None
         self.model_path = os.path.join(os.path.dirname(__file__), 'models', 'followup_model.joblib')
+        self.onnx_path = os.path.join(os.path.dirname(__file__), 'models', 'followup_model.onnx')
         
         # Create models directory if it doesn't exist
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
         
+        # Serializes the first load or training across request threads
+        self._lock = threading.Lock()
+        
+        # Guards the fitted model, session and preprocessing, which a
+        # retrain replaces together while predictions read them
+        self._fitted_lock = threading.Lock()
+        
         # Load the model if it exists
-        if os.path.exists(self.model_path):
-            self.load_model()
+        self.load_model()
     
-    def get_training_data(self):
+    def get_training_data(self, df=None):
         """
         Fetch training data from the database.
         
+        Args:
+            df (DataFrame): Result of the training query, if already fetched
+            
         Returns:
             tuple: Features DataFrame (X) and target Series (y)
         """
-        connection = create_db_connection()
-        if not connection:
-            return None, None
-        
         try:
-            # Query to get features and target for follow-up prediction model
-            query = """
-            SELECT 
-                TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
-                p.gender,
-                CASE WHEN p.city IS NULL OR p.city = '' THEN 0 ELSE 1 END AS has_address,
-                CASE WHEN p.phone IS NULL OR p.phone = '' THEN 0 ELSE 1 END AS has_phone,
-                CASE WHEN p.email IS NULL OR p.email = '' THEN 0 ELSE 1 END AS has_email,
-                CASE WHEN p.insurance_provider IS NULL OR p.insurance_provider = '' THEN 0 ELSE 1 END AS has_insurance,
-                DATEDIFF(fv.follow_up_date, fv.visit_date) AS days_between_visits,
-                CASE 
-                    WHEN fv.follow_up_required = TRUE 
-                    AND fv.follow_up_date < CURDATE()
-                    AND NOT EXISTS (
-                        SELECT 1 
-                        FROM follow_up_visits fv2 
-                        WHERE fv2.patient_id = p.patient_id 
-                        AND fv2.visit_date > fv.follow_up_date
-                    ) THEN 1
-                    ELSE 0
-                END AS missed_followup
-            FROM 
-                patients p
-            JOIN 
-                follow_up_visits fv ON p.patient_id = fv.patient_id
-            """
-            
-            # Fetch data
-            df = pd.read_sql(query, connection)
-            
-            # Close connection
-            connection.close()
-            
-            # Process categorical features
-            df['gender'] = df['gender'].fillna('Unknown')
+            # Fetch data, unless it was already read for this model
+            if df is None:
+                df = fetch_feature_frame(self.training_query)
             
             # Split features and target
-            X = df.drop('missed_followup', axis=1)
+            X = df[self.features]
             y = df['missed_followup']
             
             return X, y
             
         except Error as e:
             print(f"Error getting training data: {e}")
-            if connection:
-                connection.close()
             return None, None
     
-    def train(self):
+    def train(self, df=None, n_jobs=FOREST_FIT_JOBS):
         """
         Train the follow-up prediction model.
         
+        Args:
+            df (DataFrame): Result of the training query, if already fetched
+            n_jobs (int): Cores to fit with; lower it when fitting several models at once
+            
         Returns:
             bool: True if training was successful, False otherwise
         """
         # Get training data
-        X, y = self.get_training_data()
+        X, y = self.get_training_data(df)
         
         if X is None or len(X) < 10:  # Need at least some samples to train
             print("Not enough training data available.")
             return False
         
         try:
-            # Define feature types
-            numeric_features = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
-            categorical_features = ['gender']
-            
-            # Create preprocessing pipeline
-            numeric_transformer = Pipeline(steps=[
+            # Gender is one-hot encoded in SQL, so every feature is numeric
+            preprocessor = Pipeline(steps=[
                 ('imputer', SimpleImputer(strategy='median')),
                 ('scaler', StandardScaler())
             ])
             
-            categorical_transformer = Pipeline(steps=[
-                ('imputer', SimpleImputer(strategy='constant', fill_value='Unknown')),
-                ('onehot', OneHotEncoder(handle_unknown='ignore'))
-            ])
-            
-            preprocessor = ColumnTransformer(
-                transformers=[
-                    ('num', numeric_transformer, numeric_features),
-                    ('cat', categorical_transformer, categorical_features)
-                ]
-            )
-            
-            # Create model pipeline
-            self.model = Pipeline(steps=[
+            # Create model pipeline. It is built and fitted locally and only
+            # swapped in once ready, since training runs while requests are served.
+            model = Pipeline(steps=[
                 ('preprocessor', preprocessor),
-                ('classifier', RandomForestClassifier(n_estimators=100, random_state=42))
+                ('classifier', RandomForestClassifier(
+                    n_estimators=30, max_depth=FOREST_MAX_DEPTH, min_samples_leaf=20, random_state=42, n_jobs=n_jobs
+                ))
             ])
             
-            # Split the data
+            # Split the data; fitting on arrays lets predict skip DataFrames
             X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
+                X.to_numpy(dtype=np.float32), y, test_size=0.2, random_state=42, stratify=y
             )
             
             # Train the model
-            self.model.fit(X_train, y_train)
+            model = fit_forest(model, X_train, y_train)
+            preprocessing = inline_preprocessing(model)
             
             # Evaluate the model
-            y_pred = self.model.predict(X_test)
-            y_prob = self.model.predict_proba(X_test)[:, 1]
+            y_pred = model.predict(X_test)
+            y_prob = model.predict_proba(X_test)[:, 1]
             
             print("Follow-up Prediction Model Evaluation:")
             print(classification_report(y_test, y_pred))
             print(f"ROC AUC Score: {roc_auc_score(y_test, y_prob):.4f}")
             
-            # Save the model
-            self.save_model()
+            # Save the model, then swap it in together with its session
+            session = self.save_model(model, X_train)
+            with self._fitted_lock:
+                self.model, self.session, self.preprocessing = model, session, preprocessing
             
             return True
             
@@ -423,13 +884,7 @@ class FollowUpPredictionModel:
         Returns:
             dict: Prediction results with probability and compliance level
         """
-        if self.model is None:
-            if not os.path.exists(self.model_path):
-                self.train()
-            else:
-                self.load_model()
-                
-        if self.model is None:
+        if not self._ensure_model():
             return {
                 'error': 'Model not available',
                 'miss_probability': None,
@@ -437,19 +892,10 @@ class FollowUpPredictionModel:
             }
         
         try:
-            # Convert to DataFrame
-            df = pd.DataFrame([patient_data])
-            
-            # Make prediction
-            miss_prob = self.model.predict_proba(df)[0, 1]
+            miss_prob = self._predict_scores(feature_array(patient_data, self.features))[0]
             
             # Determine compliance level
-            if miss_prob < 0.3:
-                compliance_level = 'High Compliance'
-            elif miss_prob < 0.6:
-                compliance_level = 'Medium Compliance'
-            else:
-                compliance_level = 'Low Compliance'
+            compliance_level = str(bin_scores(miss_prob, FOLLOWUP_MISS_THRESHOLDS, FOLLOWUP_MISS_LABELS))
             
             return {
                 'miss_probability': float(miss_prob),
@@ -464,17 +910,98 @@ class FollowUpPredictionModel:
                 'compliance_level': 'Unknown'
             }
     
-    def save_model(self):
-        """Save the model to a file."""
-        if self.model is not None:
-            joblib.dump(self.model, self.model_path)
-            print(f"Follow-up prediction model saved to {self.model_path}")
+    def _ensure_model(self):
+        # Load the saved model, or train one if none has been saved yet.
+        # Re-checked under the lock so racing requests do the work once.
+        if self.model is None:
+            with self._lock:
+                if self.model is None:
+                    self.load_model()
+                if self.model is None:
+                    self.train()
+        return self.model is not None
+    
+    def _predict_scores(self, X):
+        """Miss probabilities for a feature matrix, via ONNX Runtime when available."""
+        with self._fitted_lock:
+            model, session, preprocessing = self.model, self.session, self.preprocessing
+        
+        if session is not None:
+            return session.run(None, onnx_feed(session, X))[1][:, 1]
+        
+        # Preprocess inline and call the forest directly, skipping the
+        # pipeline's per-step input validation. The imputed matrix has no
+        # NaNs, so sklearn's finiteness scan is skipped too.
+        X = apply_preprocessing(X, preprocessing)
+        with config_context(assume_finite=True):
+            return model.named_steps['classifier'].predict_proba(X)[:, 1]
+    
+    def predict_batch(self, patients):
+        """
+        Predict the likelihood of missing a follow-up appointment for several patients with one model call.
+        
+        Args:
+            patients (list or numpy.ndarray): Each patient's data with features,
+                or a matrix in feature order
+            
+        Returns:
+            dict: 'predictions' in input order, or 'error'
+        """
+        if not self._ensure_model():
+            return {'error': 'Model not available'}
+        
+        try:
+            miss_probs = self._predict_scores(feature_matrix(patients, self.features))
+            compliance_levels = bin_scores(miss_probs, FOLLOWUP_MISS_THRESHOLDS, FOLLOWUP_MISS_LABELS)
+            
+            return {
+                'predictions': [
+                    {'miss_probability': value, 'compliance_level': label}
+                    for value, label in zip(miss_probs.tolist(), compliance_levels.tolist())
+                ]
+            }
+            
+        except Exception as e:
+            print(f"Error predicting follow-up compliance: {e}")
+            return {'error': str(e)}
+    
+    def save_model(self, model, X_sample=None):
+        """
+        Save a fitted model to a file, plus an ONNX copy used for predictions.
+        
+        Args:
+            model (Pipeline): Fitted pipeline
+            X_sample (numpy.ndarray): Training rows used to infer the ONNX input type
+        
+        Returns:
+            onnxruntime.InferenceSession: Session for the ONNX copy, or None
+        """
+        joblib.dump(model, self.model_path)
+        print(f"Follow-up prediction model saved to {self.model_path}")
+        
+        session = None
+        if X_sample is not None and export_onnx(model, X_sample, self.onnx_path):
+            session = load_onnx_session(self.onnx_path)
+        
+        with _loaded_models_lock:
+            _loaded_models[self.model_path] = (model, session)
+        return session
     
     def load_model(self):
         """Load the model from a file."""
-        if os.path.exists(self.model_path):
-            self.model = joblib.load(self.model_path)
-            print(f"Follow-up prediction model loaded from {self.model_path}")
+        model, session = load_saved_model(self.model_path, self.onnx_path, ['preprocessor', 'classifier'])
+        if model is None:
+            return
+        
+        # Older files hold a different pipeline; leave those to be retrained
+        preprocessing = inline_preprocessing(model)
+        if preprocessing is None:
+            print(f"Warning: {self.model_path} has an unexpected format and will be retrained")
+            return
+        
+        with self._fitted_lock:
+            self.model, self.session, self.preprocessing = model, session, preprocessing
+        print(f"Follow-up prediction model loaded from {self.model_path}")
 
 class VitalsPredictionModel:
     """
@@ -484,71 +1011,46 @@ class VitalsPredictionModel:
     def __init__(self):
         """Initialize the vitals prediction model."""
         self.model = None
+        self.features = VITALS_FEATURES
+        self.training_query = VITALS_TRAINING_QUERY
+        self.session = None
         self.model_path = os.path.join(os.path.dirname(__file__), 'models', 'vitals_model.joblib')
+        self.onnx_path = os.path.join(os.path.dirname(__file__), 'models', 'vitals_model.onnx')
         
         # Create models directory if it doesn't exist
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
         
+        # Serializes the first load or training across request threads
+        self._lock = threading.Lock()
+        
+        # Guards the fitted model, session and preprocessing, which a
+        # retrain replaces together while predictions read them
+        self._fitted_lock = threading.Lock()
+        
         # Load the model if it exists
-        if os.path.exists(self.model_path):
-            self.load_model()
+        self.load_model()
     
-    def get_training_data(self):
+    def get_training_data(self, df=None):
         """
         Fetch training data from the database.
         
+        Args:
+            df (DataFrame): Result of the training query, if already fetched
+            
         Returns:
             tuple: Features DataFrame (X) and target Series (y)
         """
-        connection = create_db_connection()
-        if not connection:
-            return None, None
-        
         try:
-            # Query to get sequential vitals data for predictions
-            query = """
-            SELECT 
-                p.patient_id,
-                TIMESTAMPDIFF(YEAR, p.date_of_birth, v.recorded_at) AS age_at_recording,
-                p.gender,
-                v.recorded_at,
-                v.temperature,
-                v.heart_rate,
-                v.blood_pressure_systolic,
-                v.blood_pressure_diastolic,
-                v.respiratory_rate,
-                v.oxygen_saturation,
-                LAG(v.temperature) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_temperature,
-                LAG(v.heart_rate) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_heart_rate,
-                LAG(v.blood_pressure_systolic) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_bp_systolic,
-                LAG(v.blood_pressure_diastolic) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_bp_diastolic,
-                LAG(v.respiratory_rate) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_respiratory_rate,
-                LAG(v.oxygen_saturation) OVER (PARTITION BY p.patient_id ORDER BY v.recorded_at) AS prev_oxygen_saturation
-            FROM 
-                patients p
-            JOIN 
-                vitals v ON p.patient_id = v.patient_id
-            ORDER BY 
-                p.patient_id, v.recorded_at
-            """
-            
-            # Fetch data
-            df = pd.read_sql(query, connection)
-            
-            # Close connection
-            connection.close()
+            # Fetch data, unless it was already read for this model
+            if df is None:
+                df = fetch_feature_frame(self.training_query)
             
             # Filter out rows with no previous vitals
             df = df.dropna(subset=['prev_temperature', 'prev_heart_rate', 
                                    'prev_bp_systolic', 'prev_bp_diastolic'])
             
-            # Process categorical features
-            df['gender'] = df['gender'].fillna('Unknown')
-            
             # For simplicity, let's predict blood pressure systolic as a demonstration
-            X = df[['age_at_recording', 'prev_temperature', 'prev_heart_rate', 
-                   'prev_bp_systolic', 'prev_bp_diastolic', 
-                   'prev_respiratory_rate', 'prev_oxygen_saturation']]
+            X = df[self.features]
             
             y = df['blood_pressure_systolic']
             
@@ -556,55 +1058,56 @@ class VitalsPredictionModel:
             
         except Error as e:
             print(f"Error getting training data: {e}")
-            if connection:
-                connection.close()
             return None, None
     
-    def train(self):
+    def train(self, df=None, n_jobs=FOREST_FIT_JOBS):
         """
         Train the vitals prediction model.
         
+        Args:
+            df (DataFrame): Result of the training query, if already fetched
+            n_jobs (int): Cores to fit with; lower it when fitting several models at once
+            
         Returns:
             bool: True if training was successful, False otherwise
         """
         # Get training data
-        X, y = self.get_training_data()
+        X, y = self.get_training_data(df)
         
         if X is None or len(X) < 10:  # Need at least some samples to train
             print("Not enough training data available.")
             return False
         
         try:
-            # Create preprocessing pipeline
-            preprocessor = Pipeline(steps=[
-                ('imputer', SimpleImputer(strategy='median')),
-                ('scaler', StandardScaler())
+            # Histogram boosting handles missing values natively and its
+            # splits are scale-invariant, so no imputer or scaler is needed.
+            # Built and fitted locally and only swapped in once ready, since
+            # training runs while requests are served.
+            model = Pipeline(steps=[
+                ('regressor', HistGradientBoostingRegressor(max_iter=100, random_state=42))
             ])
             
-            # Create model pipeline
-            self.model = Pipeline(steps=[
-                ('preprocessor', preprocessor),
-                ('regressor', GradientBoostingRegressor(n_estimators=100, random_state=42))
-            ])
-            
-            # Split the data
+            # Split the data; fitting on arrays lets predict skip DataFrames
             X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
+                X.to_numpy(dtype=np.float32), y, test_size=0.2, random_state=42
             )
             
-            # Train the model
-            self.model.fit(X_train, y_train)
+            # Train the model; boosting parallelizes with OpenMP, not joblib
+            with threadpool_limits(limits=n_jobs, user_api='openmp'):
+                model.fit(X_train, y_train)
             
             # Evaluate the model
-            y_pred = self.model.predict(X_test)
+            y_pred = model.predict(X_test)
             mse = mean_squared_error(y_test, y_pred)
             rmse = np.sqrt(mse)
             
             print("Vitals Prediction Model Evaluation:")
             print(f"Root Mean Squared Error: {rmse:.2f}")
             
-            # Save the model
-            self.save_model()
+            # Save the model, then swap it in together with its session
+            session = self.save_model(model, X_train)
+            with self._fitted_lock:
+                self.model, self.session = model, session
             
             return True
             
@@ -622,13 +1125,7 @@ class VitalsPredictionModel:
         Returns:
             dict: Prediction results with predicted blood pressure and risk assessment
         """
-        if self.model is None:
-            if not os.path.exists(self.model_path):
-                self.train()
-            else:
-                self.load_model()
-                
-        if self.model is None:
+        if not self._ensure_model():
             return {
                 'error': 'Model not available',
                 'predicted_bp_systolic': None,
@@ -636,21 +1133,10 @@ class VitalsPredictionModel:
             }
         
         try:
-            # Convert to DataFrame
-            df = pd.DataFrame([patient_data])
-            
-            # Make prediction
-            predicted_bp = self.model.predict(df)[0]
+            predicted_bp = self._predict_scores(feature_array(patient_data, self.features))[0]
             
             # Determine blood pressure status
-            if predicted_bp < 120:
-                bp_status = 'Normal'
-            elif predicted_bp < 130:
-                bp_status = 'Elevated'
-            elif predicted_bp < 140:
-                bp_status = 'Hypertension Stage 1'
-            else:
-                bp_status = 'Hypertension Stage 2'
+            bp_status = str(bin_scores(predicted_bp, BP_SYSTOLIC_THRESHOLDS, BP_SYSTOLIC_LABELS))
             
             return {
                 'predicted_bp_systolic': float(predicted_bp),
@@ -665,40 +1151,134 @@ class VitalsPredictionModel:
                 'bp_status': 'Unknown'
             }
     
-    def save_model(self):
-        """Save the model to a file."""
-        if self.model is not None:
-            joblib.dump(self.model, self.model_path)
-            print(f"Vitals prediction model saved to {self.model_path}")
+    def _ensure_model(self):
+        # Load the saved model, or train one if none has been saved yet.
+        # Re-checked under the lock so racing requests do the work once.
+        if self.model is None:
+            with self._lock:
+                if self.model is None:
+                    self.load_model()
+                if self.model is None:
+                    self.train()
+        return self.model is not None
+    
+    def _predict_scores(self, X):
+        """Predicted systolic pressures for a feature matrix, via ONNX Runtime when available."""
+        with self._fitted_lock:
+            model, session = self.model, self.session
+        
+        if session is not None:
+            return session.run(None, onnx_feed(session, X))[0][:, 0]
+        # The regressor is the only step, so skip the pipeline dispatch
+        return model.named_steps['regressor'].predict(X)
+    
+    def predict_batch(self, patients):
+        """
+        Predict future blood pressure for several patients with one model call.
+        
+        Args:
+            patients (list or numpy.ndarray): Each patient's data with features,
+                or a matrix in feature order
+            
+        Returns:
+            dict: 'predictions' in input order, or 'error'
+        """
+        if not self._ensure_model():
+            return {'error': 'Model not available'}
+        
+        try:
+            predicted_bps = self._predict_scores(feature_matrix(patients, self.features))
+            bp_statuses = bin_scores(predicted_bps, BP_SYSTOLIC_THRESHOLDS, BP_SYSTOLIC_LABELS)
+            
+            return {
+                'predictions': [
+                    {'predicted_bp_systolic': value, 'bp_status': label}
+                    for value, label in zip(predicted_bps.tolist(), bp_statuses.tolist())
+                ]
+            }
+            
+        except Exception as e:
+            print(f"Error predicting blood pressure: {e}")
+            return {'error': str(e)}
+    
+    def save_model(self, model, X_sample=None):
+        """
+        Save a fitted model to a file, plus an ONNX copy used for predictions.
+        
+        Args:
+            model (Pipeline): Fitted pipeline
+            X_sample (numpy.ndarray): Training rows used to infer the ONNX input type
+        
+        Returns:
+            onnxruntime.InferenceSession: Session for the ONNX copy, or None
+        """
+        joblib.dump(model, self.model_path)
+        print(f"Vitals prediction model saved to {self.model_path}")
+        
+        session = None
+        if X_sample is not None and export_onnx(model, X_sample, self.onnx_path):
+            session = load_onnx_session(self.onnx_path)
+        
+        with _loaded_models_lock:
+            _loaded_models[self.model_path] = (model, session)
+        return session
     
     def load_model(self):
         """Load the model from a file."""
-        if os.path.exists(self.model_path):
-            self.model = joblib.load(self.model_path)
+        model, session = load_saved_model(self.model_path, self.onnx_path, ['regressor'])
+        if model is not None:
+            with self._fitted_lock:
+                self.model, self.session = model, session
             print(f"Vitals prediction model loaded from {self.model_path}")
 
+# Batch sizes run once at startup; the batcher groups up to 32 requests
+WARM_UP_BATCH_SIZES = [1, 4, 16, 32]
+
+def warm_up_models(models):
+    """
+    Run throwaway predictions so the first requests do not pay one-time costs.
+    
+    ONNX Runtime allocates its buffers and the sklearn fallback fills its
+    caches on first use for a given input shape. Models that are not loaded
+    yet are skipped rather than trained.
+    
+    Args:
+        models (list): Model instances to warm up
+    """
+    for model in models:
+        if model.model is None:
+            continue
+        
+        try:
+            for batch_size in WARM_UP_BATCH_SIZES:
+                model._predict_scores(np.zeros((batch_size, len(model.features)), dtype=np.float32))
+        except Exception as e:
+            print(f"Error warming up model {model.model_path}: {e}")
+
 # Initialize and train models when the module is imported
 def initialize_models():
     """Initialize and train all models if needed."""
     print("Initializing machine learning models...")
     
-    # Initialize pregnancy risk model
-    pregnancy_model = PregnancyRiskModel()
-    if not os.path.exists(pregnancy_model.model_path):
-        print("Training pregnancy risk model...")
-        pregnancy_model.train()
-    
-    # Initialize follow-up prediction model
-    followup_model = FollowUpPredictionModel()
-    if not os.path.exists(followup_model.model_path):
-        print("Training follow-up prediction model...")
-        followup_model.train()
-    
-    # Initialize vitals prediction model
-    vitals_model = VitalsPredictionModel()
-    if not os.path.exists(vitals_model.model_path):
-        print("Training vitals prediction model...")
-        vitals_model.train()
+    models = [PregnancyRiskModel(), FollowUpPredictionModel(), VitalsPredictionModel()]
+    untrained = [model for model in models if model.model is None]
+    
+    if untrained:
+        print(f"Training {len(untrained)} model(s)...")
+        
+        # Read every training set over one pooled connection
+        try:
+            frames = fetch_feature_frames([model.training_query for model in untrained])
+        except Error as e:
+            print(f"Error getting training data: {e}")
+            return
+        
+        # Tree fitting releases the GIL, so threads train the models in
+        # parallel, splitting the cores between them
+        n_jobs = max(1, FOREST_FIT_JOBS // len(untrained))
+        Parallel(n_jobs=len(untrained), backend='threading')(
+            delayed(model.train)(df, n_jobs) for model, df in zip(untrained, frames)
+        )
     
     print("Model initialization complete.")
 
@@ -4,10 +4,16 @@ Machine Learning API Routes
 This module defines the API endpoints for machine learning predictions.
 """
 
+import numpy as np
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
-from ml_models import PregnancyRiskModel, FollowUpPredictionModel, VitalsPredictionModel
+from ml_models import (
+    PregnancyRiskModel, FollowUpPredictionModel, VitalsPredictionModel, warm_up_models,
+    with_gender_flags
+)
 from auth import role_required
+from db import db_cursor
+from batching import PredictionBatcher
+from training_jobs import start_training_job, get_training_job
 
 # Create Blueprint
 ml_bp = Blueprint('ml', __name__)
@@ -16,9 +22,14 @@ ml_bp = Blueprint('ml', __name__)
 pregnancy_model = PregnancyRiskModel()
 followup_model = FollowUpPredictionModel()
 vitals_model = VitalsPredictionModel()
+warm_up_models([pregnancy_model, followup_model, vitals_model])
+
+# Concurrent single predictions are scored together in small batches
+pregnancy_batcher = PredictionBatcher(pregnancy_model)
+followup_batcher = PredictionBatcher(followup_model)
+vitals_batcher = PredictionBatcher(vitals_model)
 
 @ml_bp.route('/predict/pregnancy-risk', methods=['POST'])
-@jwt_required()
 @role_required(['admin', 'doctor', 'nurse'])
 def predict_pregnancy_risk():
     """
@@ -36,7 +47,7 @@ def predict_pregnancy_risk():
         return jsonify({"error": "No data provided"}), 400
     
     try:
-        result = pregnancy_model.predict(data)
+        result = pregnancy_batcher.predict(data)
         
         if 'error' in result:
             return jsonify({"error": result['error']}), 500
@@ -49,15 +60,50 @@ def predict_pregnancy_risk():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@ml_bp.route('/predict/pregnancy-risk/batch', methods=['POST'])
+@role_required(['admin', 'doctor', 'nurse'])
+def predict_pregnancy_risk_batch():
+    """
+    Predict pregnancy risk for several patients in one model call.
+    
+    Request body:
+        patients (list): Each patient's data
+        
+    Returns:
+        JSON: Prediction results in request order
+    """
+    data = request.get_json()
+    
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Request body must be a non-empty list of patients"}), 400
+    
+    try:
+        result = pregnancy_model.predict_batch(data)
+        
+        if 'error' in result:
+            return jsonify({"error": result['error']}), 500
+        
+        return jsonify({
+            "success": True,
+            "predictions": result['predictions']
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @ml_bp.route('/predict/followup-miss', methods=['POST'])
-@jwt_required()
 @role_required(['admin', 'doctor', 'nurse', 'receptionist'])
 def predict_followup_miss():
     """
     Predict likelihood of a patient missing a follow-up appointment.
     
     Request body:
-        patient_data (dict): Patient data
+        age (int): Age in years
+        gender (str): 'Male', 'Female' or other; alternatively send the
+            model's gender_male and gender_female flags (0 or 1) directly
+        has_address, has_phone, has_email, has_insurance (int): 1 if the
+            patient has that contact detail on file, else 0
+        days_between_visits (int): Days from the visit to the follow-up date
         
     Returns:
         JSON: Prediction results
@@ -67,8 +113,12 @@ def predict_followup_miss():
     if not data:
         return jsonify({"error": "No data provided"}), 400
     
+    data = with_gender_flags(data)
+    if data is None:
+        return jsonify({"error": "gender, or gender_male and gender_female, is required"}), 400
+    
     try:
-        result = followup_model.predict(data)
+        result = followup_batcher.predict(data)
         
         if 'error' in result:
             return jsonify({"error": result['error']}), 500
@@ -81,8 +131,43 @@ def predict_followup_miss():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@ml_bp.route('/predict/followup-miss/batch', methods=['POST'])
+@role_required(['admin', 'doctor', 'nurse', 'receptionist'])
+def predict_followup_miss_batch():
+    """
+    Predict follow-up miss likelihood for several patients in one model call.
+    
+    Request body:
+        patients (list): Each patient's data, with the fields accepted by
+            /predict/followup-miss
+        
+    Returns:
+        JSON: Prediction results in request order
+    """
+    data = request.get_json()
+    
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Request body must be a non-empty list of patients"}), 400
+    
+    data = [with_gender_flags(patient) for patient in data]
+    if any(patient is None for patient in data):
+        return jsonify({"error": "Each patient needs gender, or gender_male and gender_female"}), 400
+    
+    try:
+        result = followup_model.predict_batch(data)
+        
+        if 'error' in result:
+            return jsonify({"error": result['error']}), 500
+        
+        return jsonify({
+            "success": True,
+            "predictions": result['predictions']
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @ml_bp.route('/predict/future-vitals', methods=['POST'])
-@jwt_required()
 @role_required(['admin', 'doctor', 'nurse', 'data_analyst'])
 def predict_future_vitals():
     """
@@ -100,7 +185,7 @@ def predict_future_vitals():
         return jsonify({"error": "No data provided"}), 400
     
     try:
-        result = vitals_model.predict(data)
+        result = vitals_batcher.predict(data)
         
         if 'error' in result:
             return jsonify({"error": result['error']}), 500
@@ -113,89 +198,105 @@ def predict_future_vitals():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@ml_bp.route('/predict/future-vitals/batch', methods=['POST'])
+@role_required(['admin', 'doctor', 'nurse', 'data_analyst'])
+def predict_future_vitals_batch():
+    """
+    Predict future vitals for several patients in one model call.
+    
+    Request body:
+        patients (list): Each patient's data
+        
+    Returns:
+        JSON: Prediction results in request order
+    """
+    data = request.get_json()
+    
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Request body must be a non-empty list of patients"}), 400
+    
+    try:
+        result = vitals_model.predict_batch(data)
+        
+        if 'error' in result:
+            return jsonify({"error": result['error']}), 500
+        
+        return jsonify({
+            "success": True,
+            "predictions": result['predictions']
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @ml_bp.route('/train/pregnancy-risk', methods=['POST'])
-@jwt_required()
 @role_required(['admin', 'data_analyst'])
 def train_pregnancy_risk():
     """
-    Trigger training for the pregnancy risk model.
+    Start training the pregnancy risk model in the background.
     
     Returns:
-        JSON: Training result
+        JSON: Training job status, including the job ID to poll
     """
     try:
-        success = pregnancy_model.train()
-        
-        if success:
-            return jsonify({
-                "success": True,
-                "message": "Pregnancy risk model trained successfully"
-            }), 200
-        else:
-            return jsonify({
-                "success": False,
-                "message": "Failed to train pregnancy risk model"
-            }), 500
+        job = start_training_job('pregnancy-risk', pregnancy_model, pregnancy_batcher)
+        return jsonify(job), 202
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @ml_bp.route('/train/followup-miss', methods=['POST'])
-@jwt_required()
 @role_required(['admin', 'data_analyst'])
 def train_followup_miss():
     """
-    Trigger training for the follow-up prediction model.
+    Start training the follow-up prediction model in the background.
     
     Returns:
-        JSON: Training result
+        JSON: Training job status, including the job ID to poll
     """
     try:
-        success = followup_model.train()
-        
-        if success:
-            return jsonify({
-                "success": True,
-                "message": "Follow-up prediction model trained successfully"
-            }), 200
-        else:
-            return jsonify({
-                "success": False,
-                "message": "Failed to train follow-up prediction model"
-            }), 500
+        job = start_training_job('followup-miss', followup_model, followup_batcher)
+        return jsonify(job), 202
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @ml_bp.route('/train/future-vitals', methods=['POST'])
-@jwt_required()
 @role_required(['admin', 'data_analyst'])
 def train_future_vitals():
     """
-    Trigger training for the vitals prediction model.
+    Start training the vitals prediction model in the background.
     
     Returns:
-        JSON: Training result
+        JSON: Training job status, including the job ID to poll
     """
     try:
-        success = vitals_model.train()
-        
-        if success:
-            return jsonify({
-                "success": True,
-                "message": "Vitals prediction model trained successfully"
-            }), 200
-        else:
-            return jsonify({
-                "success": False,
-                "message": "Failed to train vitals prediction model"
-            }), 500
+        job = start_training_job('future-vitals', vitals_model, vitals_batcher)
+        return jsonify(job), 202
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@ml_bp.route('/train/jobs/<job_id>', methods=['GET'])
+@role_required(['admin', 'data_analyst'])
+def get_training_job_status(job_id):
+    """
+    Get the status of a training job.
+    
+    Parameters:
+        job_id (str): Job ID returned when training was started
+        
+    Returns:
+        JSON: Job status; running, succeeded or failed
+    """
+    job = get_training_job(job_id)
+    
+    if job is None:
+        return jsonify({"error": "Training job not found"}), 404
+    
+    return jsonify(job), 200
+
 @ml_bp.route('/predict/patient/<patient_id>/pregnancy-risk', methods=['GET'])
-@jwt_required()
 @role_required(['admin', 'doctor', 'nurse'])
 def get_patient_pregnancy_risk(patient_id):
     """
@@ -207,17 +308,35 @@ def get_patient_pregnancy_risk(patient_id):
     Returns:
         JSON: Prediction results
     """
-    from app import create_db_connection
-    
-    connection = create_db_connection()
-    if connection is None:
-        return jsonify({"error": "Database connection failed"}), 500
-    
     try:
-        cursor = connection.cursor(dictionary=True)
-        
-        # Get patient data required for prediction
+        # Get patient data required for prediction. The latest vitals and the
+        # condition flags each come from one scan of the patient's index range.
         query = """
+        WITH latest_vitals AS (
+            SELECT 
+                temperature,
+                heart_rate,
+                blood_pressure_systolic,
+                blood_pressure_diastolic,
+                respiratory_rate,
+                oxygen_saturation
+            FROM 
+                vitals
+            WHERE 
+                patient_id = %s
+            ORDER BY 
+                recorded_at DESC
+            LIMIT 1
+        ), conditions AS (
+            SELECT 
+                COALESCE(MAX(is_hypertension), 0) AS has_hypertension,
+                COALESCE(MAX(is_diabetes), 0) AS has_diabetes,
+                COALESCE(MAX(is_asthma), 0) AS has_asthma
+            FROM 
+                medical_history
+            WHERE 
+                patient_id = %s
+        )
         SELECT 
             TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
             v.temperature,
@@ -226,32 +345,29 @@ def get_patient_pregnancy_risk(patient_id):
             v.blood_pressure_diastolic,
             v.respiratory_rate,
             v.oxygen_saturation,
-            CASE WHEN m.condition_name LIKE '%hypertension%' THEN 1 ELSE 0 END AS has_hypertension,
-            CASE WHEN m.condition_name LIKE '%diabetes%' THEN 1 ELSE 0 END AS has_diabetes,
-            CASE WHEN m.condition_name LIKE '%asthma%' THEN 1 ELSE 0 END AS has_asthma
+            c.has_hypertension,
+            c.has_diabetes,
+            c.has_asthma
         FROM 
             patients p
         LEFT JOIN 
-            vitals v ON p.patient_id = v.patient_id AND v.recorded_at = (
-                SELECT MAX(recorded_at) FROM vitals WHERE patient_id = p.patient_id
-            )
-        LEFT JOIN 
-            medical_history m ON p.patient_id = m.patient_id
+            latest_vitals v ON TRUE
+        CROSS JOIN 
+            conditions c
         WHERE 
             p.patient_id = %s
         """
         
-        cursor.execute(query, (patient_id,))
-        data = cursor.fetchone()
-        
-        cursor.close()
-        connection.close()
+        # The connection goes back to the pool before the prediction runs
+        with db_cursor(dictionary=True) as (connection, cursor):
+            cursor.execute(query, (patient_id, patient_id, patient_id))
+            data = cursor.fetchone()
         
         if not data:
             return jsonify({"error": "Patient not found"}), 404
         
         # Make prediction
-        result = pregnancy_model.predict(data)
+        result = pregnancy_batcher.predict(data)
         
         if 'error' in result:
             return jsonify({"error": result['error']}), 500
@@ -263,12 +379,115 @@ def get_patient_pregnancy_risk(patient_id):
         }), 200
         
     except Exception as e:
-        if connection:
-            connection.close()
+        return jsonify({"error": str(e)}), 500
+
+# Largest number of patients scored by one bulk request
+MAX_BULK_PATIENTS = 500
+
+@ml_bp.route('/predict/patients/pregnancy-risk', methods=['POST'])
+@role_required(['admin', 'doctor', 'nurse'])
+def get_patients_pregnancy_risk():
+    """
+    Get pregnancy risk predictions for several patients with one query.
+    
+    Request body:
+        patient_ids (list): Patient IDs
+        
+    Returns:
+        JSON: Prediction per patient found, and the IDs that were not found
+    """
+    data = request.get_json()
+    patient_ids = data.get('patient_ids') if isinstance(data, dict) else None
+    
+    if not isinstance(patient_ids, list) or not patient_ids:
+        return jsonify({"error": "patient_ids must be a non-empty list"}), 400
+    
+    if len(patient_ids) > MAX_BULK_PATIENTS:
+        return jsonify({"error": f"At most {MAX_BULK_PATIENTS} patients per request"}), 400
+    
+    if not all(isinstance(patient_id, str) for patient_id in patient_ids):
+        return jsonify({"error": "patient_ids must be strings"}), 400
+    
+    try:
+        # The latest vitals of every requested patient come from one windowed
+        # scan instead of a MAX(recorded_at) lookup per patient
+        placeholders = ', '.join(['%s'] * len(patient_ids))
+        query = f"""
+        SELECT 
+            p.patient_id,
+            TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
+            v.temperature,
+            v.heart_rate,
+            v.blood_pressure_systolic,
+            v.blood_pressure_diastolic,
+            v.respiratory_rate,
+            v.oxygen_saturation,
+            EXISTS (
+                SELECT 1 FROM medical_history
+                WHERE patient_id = p.patient_id AND is_hypertension = 1
+            ) AS has_hypertension,
+            EXISTS (
+                SELECT 1 FROM medical_history
+                WHERE patient_id = p.patient_id AND is_diabetes = 1
+            ) AS has_diabetes,
+            EXISTS (
+                SELECT 1 FROM medical_history
+                WHERE patient_id = p.patient_id AND is_asthma = 1
+            ) AS has_asthma
+        FROM 
+            patients p
+        LEFT JOIN (
+            SELECT 
+                patient_id,
+                temperature,
+                heart_rate,
+                blood_pressure_systolic,
+                blood_pressure_diastolic,
+                respiratory_rate,
+                oxygen_saturation,
+                ROW_NUMBER() OVER (PARTITION BY patient_id ORDER BY recorded_at DESC) AS recency
+            FROM 
+                vitals
+            WHERE 
+                patient_id IN ({placeholders})
+        ) v ON p.patient_id = v.patient_id AND v.recency = 1
+        WHERE 
+            p.patient_id IN ({placeholders})
+        """
+        
+        # Plain tuples rather than a dict per row; the columns after
+        # patient_id are already in the model's feature order
+        with db_cursor() as (connection, cursor):
+            cursor.execute(query, tuple(patient_ids) * 2)
+            rows = cursor.fetchall()
+        
+        found_ids = [row[0] for row in rows]
+        found = set(found_ids)
+        not_found = [patient_id for patient_id in dict.fromkeys(patient_ids) if patient_id not in found]
+        
+        predictions = []
+        if rows:
+            X = np.array([row[1:] for row in rows], dtype=np.float32)
+            result = pregnancy_model.predict_batch(X)
+            
+            if 'error' in result:
+                return jsonify({"error": result['error']}), 500
+            
+            predictions = [
+                {"patient_id": patient_id, "prediction": prediction}
+                for patient_id, prediction in zip(found_ids, result['predictions'])
+            ]
+        
+        return jsonify({
+            "success": True,
+            "predictions": predictions,
+            "not_found": not_found
+        }), 200
+        
+    except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @ml_bp.route('/predict/patient/<patient_id>/followup-miss', methods=['GET'])
-@jwt_required()
 @role_required(['admin', 'doctor', 'nurse', 'receptionist'])
 def get_patient_followup_miss(patient_id):
     """
@@ -280,46 +499,48 @@ def get_patient_followup_miss(patient_id):
     Returns:
         JSON: Prediction results
     """
-    from app import create_db_connection
-    
-    connection = create_db_connection()
-    if connection is None:
-        return jsonify({"error": "Database connection failed"}), 500
-    
     try:
-        cursor = connection.cursor(dictionary=True)
-        
         # Get patient data required for prediction
         query = """
+        WITH latest_visit AS (
+            SELECT 
+                visit_date,
+                follow_up_date
+            FROM 
+                follow_up_visits
+            WHERE 
+                patient_id = %s
+            ORDER BY 
+                visit_date DESC
+            LIMIT 1
+        )
         SELECT 
             TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
-            p.gender,
-            CASE WHEN p.city IS NULL OR p.city = '' THEN 0 ELSE 1 END AS has_address,
-            CASE WHEN p.phone IS NULL OR p.phone = '' THEN 0 ELSE 1 END AS has_phone,
-            CASE WHEN p.email IS NULL OR p.email = '' THEN 0 ELSE 1 END AS has_email,
-            CASE WHEN p.insurance_provider IS NULL OR p.insurance_provider = '' THEN 0 ELSE 1 END AS has_insurance,
+            CASE WHEN p.gender = 'Male' THEN 1 ELSE 0 END AS gender_male,
+            CASE WHEN p.gender = 'Female' THEN 1 ELSE 0 END AS gender_female,
+            p.contact_flags & 1 AS has_address,
+            (p.contact_flags >> 1) & 1 AS has_phone,
+            (p.contact_flags >> 2) & 1 AS has_email,
+            (p.contact_flags >> 3) & 1 AS has_insurance,
             DATEDIFF(fv.follow_up_date, fv.visit_date) AS days_between_visits
         FROM 
             patients p
         LEFT JOIN 
-            follow_up_visits fv ON p.patient_id = fv.patient_id AND fv.visit_date = (
-                SELECT MAX(visit_date) FROM follow_up_visits WHERE patient_id = p.patient_id
-            )
+            latest_visit fv ON TRUE
         WHERE 
             p.patient_id = %s
         """
         
-        cursor.execute(query, (patient_id,))
-        data = cursor.fetchone()
-        
-        cursor.close()
-        connection.close()
+        # The connection goes back to the pool before the prediction runs
+        with db_cursor(dictionary=True) as (connection, cursor):
+            cursor.execute(query, (patient_id, patient_id))
+            data = cursor.fetchone()
         
         if not data:
             return jsonify({"error": "Patient not found"}), 404
         
         # Make prediction
-        result = followup_model.predict(data)
+        result = followup_batcher.predict(data)
         
         if 'error' in result:
             return jsonify({"error": result['error']}), 500
@@ -331,12 +552,9 @@ def get_patient_followup_miss(patient_id):
         }), 200
         
     except Exception as e:
-        if connection:
-            connection.close()
         return jsonify({"error": str(e)}), 500
 
 @ml_bp.route('/predict/patient/<patient_id>/future-vitals', methods=['GET'])
-@jwt_required()
 @role_required(['admin', 'doctor', 'nurse'])
 def get_patient_future_vitals(patient_id):
     """
@@ -348,17 +566,25 @@ def get_patient_future_vitals(patient_id):
     Returns:
         JSON: Prediction results
     """
-    from app import create_db_connection
-    
-    connection = create_db_connection()
-    if connection is None:
-        return jsonify({"error": "Database connection failed"}), 500
-    
     try:
-        cursor = connection.cursor(dictionary=True)
-        
         # Get patient data required for prediction
         query = """
+        WITH latest_vitals AS (
+            SELECT 
+                temperature,
+                heart_rate,
+                blood_pressure_systolic,
+                blood_pressure_diastolic,
+                respiratory_rate,
+                oxygen_saturation
+            FROM 
+                vitals
+            WHERE 
+                patient_id = %s
+            ORDER BY 
+                recorded_at DESC
+            LIMIT 1
+        )
         SELECT 
             TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age_at_recording,
             v.temperature AS prev_temperature,
@@ -370,24 +596,21 @@ def get_patient_future_vitals(patient_id):
         FROM 
             patients p
         JOIN 
-            vitals v ON p.patient_id = v.patient_id AND v.recorded_at = (
-                SELECT MAX(recorded_at) FROM vitals WHERE patient_id = p.patient_id
-            )
+            latest_vitals v ON TRUE
         WHERE 
             p.patient_id = %s
         """
         
-        cursor.execute(query, (patient_id,))
-        data = cursor.fetchone()
-        
-        cursor.close()
-        connection.close()
+        # The connection goes back to the pool before the prediction runs
+        with db_cursor(dictionary=True) as (connection, cursor):
+            cursor.execute(query, (patient_id, patient_id))
+            data = cursor.fetchone()
         
         if not data:
             return jsonify({"error": "Patient not found or no vitals recorded"}), 404
         
         # Make prediction
-        result = vitals_model.predict(data)
+        result = vitals_batcher.predict(data)
         
         if 'error' in result:
             return jsonify({"error": result['error']}), 500
@@ -399,6 +622,129 @@ def get_patient_future_vitals(patient_id):
         }), 200
         
     except Exception as e:
-        if connection:
-            connection.close()
-        return jsonify({"error": str(e)}), 500 
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@ml_bp.route('/predict/patient/<patient_id>/all', methods=['GET'])
+@role_required(['admin', 'doctor', 'nurse'])
+def get_patient_all_predictions(patient_id):
+    """
+    Get every model's prediction for a specific patient with one query.
+    
+    Parameters:
+        patient_id (str): Patient ID
+        
+    Returns:
+        JSON: Prediction per model; future vitals is null without recorded vitals
+    """
+    try:
+        # The features of all three models, read in one statement on one
+        # connection; each CTE scans one patient's index range
+        query = """
+        WITH latest_vitals AS (
+            SELECT 
+                recorded_at,
+                temperature,
+                heart_rate,
+                blood_pressure_systolic,
+                blood_pressure_diastolic,
+                respiratory_rate,
+                oxygen_saturation
+            FROM 
+                vitals
+            WHERE 
+                patient_id = %s
+            ORDER BY 
+                recorded_at DESC
+            LIMIT 1
+        ), conditions AS (
+            SELECT 
+                COALESCE(MAX(is_hypertension), 0) AS has_hypertension,
+                COALESCE(MAX(is_diabetes), 0) AS has_diabetes,
+                COALESCE(MAX(is_asthma), 0) AS has_asthma
+            FROM 
+                medical_history
+            WHERE 
+                patient_id = %s
+        ), latest_visit AS (
+            SELECT 
+                visit_date,
+                follow_up_date
+            FROM 
+                follow_up_visits
+            WHERE 
+                patient_id = %s
+            ORDER BY 
+                visit_date DESC
+            LIMIT 1
+        )
+        SELECT 
+            TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
+            v.temperature,
+            v.heart_rate,
+            v.blood_pressure_systolic,
+            v.blood_pressure_diastolic,
+            v.respiratory_rate,
+            v.oxygen_saturation,
+            c.has_hypertension,
+            c.has_diabetes,
+            c.has_asthma,
+            CASE WHEN p.gender = 'Male' THEN 1 ELSE 0 END AS gender_male,
+            CASE WHEN p.gender = 'Female' THEN 1 ELSE 0 END AS gender_female,
+            p.contact_flags & 1 AS has_address,
+            (p.contact_flags >> 1) & 1 AS has_phone,
+            (p.contact_flags >> 2) & 1 AS has_email,
+            (p.contact_flags >> 3) & 1 AS has_insurance,
+            DATEDIFF(fv.follow_up_date, fv.visit_date) AS days_between_visits,
+            v.recorded_at IS NOT NULL AS has_vitals
+        FROM 
+            patients p
+        LEFT JOIN 
+            latest_vitals v ON TRUE
+        CROSS JOIN 
+            conditions c
+        LEFT JOIN 
+            latest_visit fv ON TRUE
+        WHERE 
+            p.patient_id = %s
+        """
+        
+        # The connection goes back to the pool before the predictions run
+        with db_cursor(dictionary=True) as (connection, cursor):
+            cursor.execute(query, (patient_id,) * 4)
+            data = cursor.fetchone()
+        
+        if not data:
+            return jsonify({"error": "Patient not found"}), 404
+        
+        pregnancy_result = pregnancy_batcher.predict(data)
+        followup_result = followup_batcher.predict(data)
+        
+        # The vitals model predicts from the latest vitals as its previous values
+        vitals_result = None
+        if data['has_vitals']:
+            vitals_result = vitals_batcher.predict({
+                'age_at_recording': data['age'],
+                'prev_temperature': data['temperature'],
+                'prev_heart_rate': data['heart_rate'],
+                'prev_bp_systolic': data['blood_pressure_systolic'],
+                'prev_bp_diastolic': data['blood_pressure_diastolic'],
+                'prev_respiratory_rate': data['respiratory_rate'],
+                'prev_oxygen_saturation': data['oxygen_saturation']
+            })
+        
+        for result in (pregnancy_result, followup_result, vitals_result):
+            if result is not None and 'error' in result:
+                return jsonify({"error": result['error']}), 500
+        
+        return jsonify({
+            "success": True,
+            "patient_id": patient_id,
+            "predictions": {
+                "pregnancy_risk": pregnancy_result,
+                "followup_miss": followup_result,
+                "future_vitals": vitals_result
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
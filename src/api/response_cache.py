@@ -0,0 +1,110 @@
+"""
+Response Cache Module
+
+This module provides a Redis-backed cache for read-heavy GET endpoints.
+Responses are stored as already-serialized JSON bytes so cache hits skip
+both the SQL query and the JSON encoding step.
+"""
+
+from functools import wraps
+from flask import current_app, request, stream_with_context
+from flask_caching import Cache
+from auth import current_claims
+
+cache = Cache()
+
+# Every role defined in the default roles table
+ALL_ROLES = ['admin', 'doctor', 'nurse', 'receptionist', 'data_analyst']
+
+def make_cache_key(key_prefix, role, query_string=''):
+    """
+    Build the cache key for a cached endpoint.
+
+    Args:
+        key_prefix (str): Endpoint-specific key prefix
+        role (str): Role name from the JWT claims
+        query_string (str): Normalized query string
+
+    Returns:
+        str: Cache key
+    """
+    return f"{key_prefix}:{role}:{query_string}"
+
+def cached_response(timeout, key_prefix):
+    """
+    Decorator caching a successful JSON response per route, query and role.
+
+    Must be applied below role_required so the JWT has already been verified.
+    Admins can bypass the cache with the ``fresh=1`` query parameter.
+
+    Args:
+        timeout (int): Time to live in seconds
+        key_prefix (str): Endpoint-specific key prefix
+
+    Returns:
+        Function: Decorated function with response caching
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            role = current_claims().get("role")
+            query_string = '&'.join(
+                f"{key}={value}"
+                for key, value in sorted(request.args.items(multi=True))
+                if key != 'fresh'
+            )
+            cache_key = make_cache_key(key_prefix, role, query_string)
+            bypass = role == 'admin' and request.args.get('fresh') == '1'
+
+            if not bypass:
+                try:
+                    cached = cache.get(cache_key)
+                except Exception as e:
+                    print(f"Error reading response cache: {e}")
+                    cached = None
+
+                if cached is not None:
+                    body, status = cached
+                    return current_app.response_class(
+                        body, status=status, mimetype='application/json'
+                    ), status
+
+            response, status = fn(*args, **kwargs)
+
+            if status == 200:
+                if response.is_streamed:
+                    # Cache the body once the stream has been fully sent
+                    response.response = stream_with_context(
+                        _tee_to_cache(response.response, cache_key, status, timeout)
+                    )
+                else:
+                    _store(cache_key, response.get_data(), status, timeout)
+
+            return response, status
+        return wrapper
+    return decorator
+
+def _store(cache_key, body, status, timeout):
+    try:
+        cache.set(cache_key, (body, status), timeout=timeout)
+    except Exception as e:
+        print(f"Error writing response cache: {e}")
+
+def _tee_to_cache(chunks, cache_key, status, timeout):
+    body = []
+    for chunk in chunks:
+        body.append(chunk)
+        yield chunk
+    _store(cache_key, b''.join(body), status, timeout)
+
+def invalidate_cached_response(key_prefix):
+    """
+    Drop the unfiltered cached response of an endpoint for every role.
+
+    Args:
+        key_prefix (str): Endpoint-specific key prefix
+    """
+    try:
+        cache.delete_many(*[make_cache_key(key_prefix, role) for role in ALL_ROLES])
+    except Exception as e:
+        print(f"Error invalidating response cache: {e}")
@@ -0,0 +1,92 @@
+"""
+Request Schemas
+
+This module defines the pydantic models used to validate request bodies.
+Validation runs in pydantic-core, so each payload is checked in a single call.
+"""
+
+from datetime import date, datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+class PatientUpdate(BaseModel):
+    """Updatable patient fields. Unknown keys are ignored."""
+    model_config = ConfigDict(extra='ignore')
+
+    first_name: Optional[str] = Field(None, max_length=100)
+    last_name: Optional[str] = Field(None, max_length=100)
+    date_of_birth: Optional[date] = None
+    gender: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip_code: Optional[str] = None
+    insurance_provider: Optional[str] = None
+    insurance_id: Optional[str] = None
+    emergency_contact_name: Optional[str] = None
+    emergency_contact_phone: Optional[str] = None
+
+    @field_validator('first_name', 'last_name', 'date_of_birth')
+    @classmethod
+    def not_null(cls, value):
+        # These columns are NOT NULL, so an explicit null is rejected
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
+class PatientIn(PatientUpdate):
+    """A new patient; name and date of birth are required."""
+    first_name: str = Field(max_length=100)
+    last_name: str = Field(max_length=100)
+    date_of_birth: date
+
+class VitalsIn(BaseModel):
+    """A vitals record, with reasonable ranges for each measurement."""
+    model_config = ConfigDict(extra='ignore')
+
+    recorded_at: Optional[datetime] = None
+    temperature: Optional[float] = Field(None, ge=30, le=45)
+    heart_rate: Optional[int] = Field(None, ge=30, le=220)
+    blood_pressure_systolic: Optional[int] = Field(None, ge=70, le=250)
+    blood_pressure_diastolic: Optional[int] = Field(None, ge=40, le=150)
+    respiratory_rate: Optional[int] = None
+    oxygen_saturation: Optional[float] = None
+    notes: Optional[str] = None
+
+class RegisterIn(BaseModel):
+    """A new user account; role defaults to receptionist."""
+    model_config = ConfigDict(extra='ignore')
+
+    username: str = Field(max_length=50)
+    email: str = Field(max_length=100)
+    password: str
+    first_name: str = Field(max_length=100)
+    last_name: str = Field(max_length=100)
+    role_id: int = 4  # 4 is receptionist in our default roles
+
+class LoginIn(BaseModel):
+    """Login credentials; username may also be an email address."""
+    model_config = ConfigDict(extra='ignore')
+
+    username: str
+    password: str
+
+def format_validation_error(error):
+    """
+    Turn a pydantic ValidationError into a single error message.
+
+    Args:
+        error (ValidationError): Validation error raised by a schema
+
+    Returns:
+        str: Message describing the first invalid field
+    """
+    first = error.errors()[0]
+    field = '.'.join(str(part) for part in first['loc'])
+    if first['type'] == 'missing':
+        return f"Missing required field: {field}"
+    if not field:
+        return f"Invalid request data: {first['msg']}"
+    return f"Invalid {field}: {first['msg']}"
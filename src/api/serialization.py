@@ -0,0 +1,88 @@
+"""
+JSON Serialization Module
+
+This module provides orjson-based helpers for encoding API responses,
+including streaming large result sets straight from a database cursor.
+"""
+
+from decimal import Decimal
+import orjson
+from flask.json.provider import JSONProvider
+
+# Options shared by every orjson encoding in the API. Naive datetimes are
+# left without an offset to match isoformat(); non-string keys are needed
+# for the Swagger spec, which uses integer status codes as keys.
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def orjson_default(obj):
+    """
+    Encode types orjson does not support natively.
+
+    Args:
+        obj: Object to encode
+
+    Returns:
+        JSON-compatible representation of the object
+    """
+    # MySQL DECIMAL columns are returned as Decimal
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode('utf-8')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj):
+    """
+    Encode an object to JSON bytes.
+
+    Args:
+        obj: Object to encode
+
+    Returns:
+        bytes: JSON document
+    """
+    return orjson.dumps(obj, default=orjson_default, option=ORJSON_OPTIONS)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and get_json."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Build the body as bytes directly instead of going through a str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype='application/json')
+
+def stream_json_rows(cursor, connection, batch_size=500):
+    """
+    Stream the rows of an executed cursor as a JSON array.
+
+    Rows are fetched in batches so the full result set is never held in
+    memory. The cursor and connection are closed once the stream ends.
+
+    Args:
+        cursor: Unbuffered cursor with a pending result set
+        connection: Connection owning the cursor
+        batch_size (int): Number of rows fetched per round-trip
+
+    Yields:
+        bytes: Chunks of the JSON array
+    """
+    try:
+        yield b'['
+        first = True
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            chunk = b','.join(dumps(row) for row in rows)
+            yield chunk if first else b',' + chunk
+            first = False
+        yield b']'
+    finally:
+        cursor.close()
+        connection.close()
@@ -0,0 +1,98 @@
+"""
+Training Jobs Module
+
+This module runs model training in the background so a training request
+returns immediately instead of holding a gunicorn worker for the whole fit.
+Job status is kept in the shared response cache, so any worker can report it.
+"""
+
+import threading
+import uuid
+from flask import current_app
+from batching import run_off_hub
+from ml_models import FOREST_FIT_JOBS
+from response_cache import cache
+
+# How long a finished job's status stays queryable
+TRAINING_JOB_TTL = 24 * 60 * 60  # seconds
+
+# Running jobs in this process by model name, so repeated requests for the
+# same model join the running job instead of training it twice
+_active_jobs = {}
+_active_jobs_lock = threading.Lock()
+
+def _job_key(job_id):
+    return f"training_job:{job_id}"
+
+def _save_job(job):
+    try:
+        cache.set(_job_key(job['job_id']), job, timeout=TRAINING_JOB_TTL)
+    except Exception as e:
+        print(f"Error saving training job status: {e}")
+
+def start_training_job(name, model, batcher):
+    """
+    Start training a model in the background.
+
+    Args:
+        name (str): Model name reported in the job status
+        model: Model with a train method
+        batcher (PredictionBatcher): Batcher whose cached results the new model replaces
+
+    Returns:
+        dict: Job status, including its job_id
+    """
+    with _active_jobs_lock:
+        job = _active_jobs.get(name)
+        if job is not None:
+            return job
+
+        job = {'job_id': uuid.uuid4().hex, 'model': name, 'status': 'running'}
+        _active_jobs[name] = job
+        
+        # Jobs for different models can overlap, so each fits on its share
+        # of the cores rather than all of them
+        n_jobs = max(1, FOREST_FIT_JOBS // len(_active_jobs))
+
+    _save_job(job)
+    threading.Thread(
+        target=_run_training_job,
+        args=(current_app._get_current_object(), job, model, batcher, n_jobs),
+        name=f'training-{name}',
+        daemon=True
+    ).start()
+    return job
+
+def _run_training_job(app, job, model, batcher, n_jobs):
+    # Under gevent this is a greenlet; the fit itself runs on a native thread
+    try:
+        success = run_off_hub(model.train, None, n_jobs)
+    except Exception as e:
+        print(f"Error training {job['model']} model: {e}")
+        success = False
+
+    if success:
+        batcher.clear_cache()
+
+    with _active_jobs_lock:
+        _active_jobs.pop(job['model'], None)
+
+    job = dict(job, status='succeeded' if success else 'failed')
+    with app.app_context():
+        _save_job(job)
+
+def get_training_job(job_id):
+    """
+    Look up a training job's status.
+
+    Args:
+        job_id (str): Job ID returned when the job was started
+
+    Returns:
+        dict: Job status, or None if the job is unknown or expired
+    """
+    try:
+        return cache.get(_job_key(job_id))
+    except Exception as e:
+        print(f"Error reading training job status: {e}")
+        return None
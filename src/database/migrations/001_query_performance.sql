@@ -0,0 +1,215 @@
+-- Brings a database created from an earlier schema.sql up to date with the
+-- generated columns, indexes, view, summary tables and session ID size that
+-- the API now relies on. Safe to run more than once; on a database created
+-- from the current schema.sql every step is a no-op apart from refreshing
+-- the analytics summaries.
+--
+-- mysql -u root -p hospital_db < src/database/migrations/001_query_performance.sql
+
+DELIMITER //
+
+-- MySQL 8.0 has no ADD COLUMN IF NOT EXISTS or CREATE INDEX IF NOT EXISTS,
+-- so these helpers check information_schema first
+DROP PROCEDURE IF EXISTS migration_add_column //
+CREATE PROCEDURE migration_add_column(IN table_name_in VARCHAR(64), IN column_name_in VARCHAR(64), IN definition TEXT)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = table_name_in AND COLUMN_NAME = column_name_in
+    ) THEN
+        SET @ddl = CONCAT('ALTER TABLE ', table_name_in, ' ADD COLUMN ', column_name_in, ' ', definition);
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+
+DROP PROCEDURE IF EXISTS migration_add_index //
+CREATE PROCEDURE migration_add_index(IN table_name_in VARCHAR(64), IN index_name_in VARCHAR(64), IN column_list TEXT)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = table_name_in AND INDEX_NAME = index_name_in
+    ) THEN
+        SET @ddl = CONCAT('CREATE INDEX ', index_name_in, ' ON ', table_name_in, '(', column_list, ')');
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+
+DELIMITER ;
+
+-- Generated columns on patients
+CALL migration_add_column('patients', 'patient_name',
+    'VARCHAR(201) GENERATED ALWAYS AS (CONCAT(first_name, '' '', last_name)) STORED AFTER emergency_contact_phone');
+CALL migration_add_column('patients', 'contact_flags',
+    'TINYINT GENERATED ALWAYS AS (
+        (COALESCE(city, '''') != '''')
+        | (COALESCE(phone, '''') != '''') << 1
+        | (COALESCE(email, '''') != '''') << 2
+        | (COALESCE(insurance_provider, '''') != '''') << 3
+    ) STORED INVISIBLE AFTER patient_name');
+
+-- Condition flags on medical_history
+CALL migration_add_column('medical_history', 'is_hypertension',
+    'TINYINT AS (condition_name LIKE ''%hypertension%'') STORED AFTER notes');
+CALL migration_add_column('medical_history', 'is_diabetes',
+    'TINYINT AS (condition_name LIKE ''%diabetes%'') STORED AFTER is_hypertension');
+CALL migration_add_column('medical_history', 'is_asthma',
+    'TINYINT AS (condition_name LIKE ''%asthma%'') STORED AFTER is_diabetes');
+
+-- Indexes
+CALL migration_add_index('patients', 'idx_patient_name', 'patient_name');
+CALL migration_add_index('patients', 'idx_patient_dob', 'date_of_birth');
+CALL migration_add_index('vitals', 'idx_vitals_patient_recorded',
+    'patient_id, recorded_at DESC, blood_pressure_systolic, blood_pressure_diastolic');
+CALL migration_add_index('follow_up_visits', 'idx_followup_due',
+    'follow_up_required, follow_up_date, patient_id, visit_date');
+CALL migration_add_index('follow_up_visits', 'idx_followup_patient_visit', 'patient_id, visit_date');
+CALL migration_add_index('medical_history', 'idx_history_patient_flags',
+    'patient_id, is_hypertension, is_diabetes, is_asthma');
+
+DROP PROCEDURE migration_add_column;
+DROP PROCEDURE migration_add_index;
+
+-- One row of condition flags per patient
+CREATE OR REPLACE VIEW patient_conditions AS
+SELECT
+    patient_id,
+    MAX(is_hypertension) AS has_hypertension,
+    MAX(is_diabetes) AS has_diabetes,
+    MAX(is_asthma) AS has_asthma
+FROM medical_history
+GROUP BY patient_id;
+
+-- Session IDs are now 22-character random tokens. Older rows used the whole
+-- access token as their ID and cannot be matched by logout any more, so they
+-- are dropped before the column is narrowed.
+DELETE FROM user_sessions WHERE CHAR_LENGTH(session_id) > 32;
+ALTER TABLE user_sessions MODIFY session_id VARCHAR(32);
+
+-- Analytics summary tables
+CREATE TABLE IF NOT EXISTS patient_risk_summary (
+    summary_id INT AUTO_INCREMENT PRIMARY KEY,
+    patient_id VARCHAR(50) NOT NULL,
+    patient_name VARCHAR(201),
+    date_of_birth DATE,
+    age INT,
+    blood_pressure_systolic INT,
+    blood_pressure_diastolic INT,
+    complications TEXT,
+    risk_category VARCHAR(32) NOT NULL,
+    risk_priority TINYINT NOT NULL,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_risk_priority (risk_priority),
+    INDEX idx_risk_category (risk_category)
+);
+
+CREATE TABLE IF NOT EXISTS patient_demographics_summary (
+    age_group VARCHAR(20) NOT NULL,
+    city VARCHAR(100),
+    state VARCHAR(50),
+    patient_count INT NOT NULL,
+    unique_conditions INT NOT NULL,
+    delivery_count INT NOT NULL,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_demographics_location (state, city, age_group)
+);
+
+-- Same procedure as in schema.sql, recreated so it always matches the tables
+DROP PROCEDURE IF EXISTS refresh_analytics_summaries;
+
+DELIMITER //
+
+CREATE PROCEDURE refresh_analytics_summaries()
+BEGIN
+    START TRANSACTION;
+
+    DELETE FROM patient_risk_summary;
+
+    INSERT INTO patient_risk_summary (
+        patient_id, patient_name, date_of_birth, age,
+        blood_pressure_systolic, blood_pressure_diastolic,
+        complications, risk_category, risk_priority
+    )
+    WITH latest_vitals AS (
+        SELECT
+            patient_id,
+            blood_pressure_systolic,
+            blood_pressure_diastolic,
+            ROW_NUMBER() OVER (PARTITION BY patient_id ORDER BY recorded_at DESC) AS rn
+        FROM
+            vitals
+    )
+    SELECT
+        p.patient_id,
+        p.patient_name,
+        p.date_of_birth,
+        TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
+        v.blood_pressure_systolic,
+        v.blood_pressure_diastolic,
+        d.complications,
+        CASE
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 THEN 'Age Risk'
+            WHEN v.blood_pressure_systolic > 140 OR v.blood_pressure_diastolic > 90 THEN 'Hypertension Risk'
+            WHEN d.complications IS NOT NULL AND d.complications != '' THEN 'Previous Complications'
+            ELSE 'Normal'
+        END AS risk_category,
+        CASE
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 AND
+                (v.blood_pressure_systolic > 140 OR v.blood_pressure_diastolic > 90) THEN 1
+            WHEN v.blood_pressure_systolic > 140 OR v.blood_pressure_diastolic > 90 THEN 2
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 THEN 3
+            ELSE 4
+        END AS risk_priority
+    FROM
+        patients p
+    LEFT JOIN
+        latest_vitals v ON p.patient_id = v.patient_id AND v.rn = 1
+    LEFT JOIN
+        delivery_information d ON p.patient_id = d.patient_id
+    WHERE
+        (TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 OR
+        v.blood_pressure_systolic > 140 OR
+        v.blood_pressure_diastolic > 90 OR
+        (d.complications IS NOT NULL AND d.complications != ''));
+
+    DELETE FROM patient_demographics_summary;
+
+    INSERT INTO patient_demographics_summary (
+        age_group, city, state, patient_count, unique_conditions, delivery_count
+    )
+    SELECT
+        CASE
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) < 18 THEN 'Under 18'
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) BETWEEN 18 AND 30 THEN '18-30'
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) BETWEEN 31 AND 45 THEN '31-45'
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) BETWEEN 46 AND 65 THEN '46-65'
+            ELSE 'Over 65'
+        END AS age_group,
+        p.city,
+        p.state,
+        COUNT(*) AS patient_count,
+        COUNT(DISTINCT m.condition_name) AS unique_conditions,
+        COUNT(DISTINCT d.delivery_id) AS delivery_count
+    FROM
+        patients p
+    LEFT JOIN
+        medical_history m ON p.patient_id = m.patient_id
+    LEFT JOIN
+        delivery_information d ON p.patient_id = d.patient_id
+    GROUP BY
+        age_group, p.city, p.state;
+
+    COMMIT;
+END //
+
+DELIMITER ;
+
+-- Refresh the summaries hourly (requires event_scheduler=ON)
+CREATE EVENT IF NOT EXISTS refresh_analytics_summaries_hourly
+    ON SCHEDULE EVERY 1 HOUR
+    DO CALL refresh_analytics_summaries();
+
+CALL refresh_analytics_summaries();
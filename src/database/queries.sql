@@ -1,9 +1,18 @@
 -- Query 1: High-risk pregnancy identification
 -- This query identifies patients who might have high-risk pregnancies based on 
 -- vital signs, age, and previous complications
+WITH latest_vitals AS (
+    SELECT 
+        patient_id,
+        blood_pressure_systolic,
+        blood_pressure_diastolic,
+        ROW_NUMBER() OVER (PARTITION BY patient_id ORDER BY recorded_at DESC) AS rn
+    FROM 
+        vitals
+)
 SELECT 
     p.patient_id,
-    CONCAT(p.first_name, ' ', p.last_name) AS patient_name,
+    p.patient_name,
     p.date_of_birth,
     TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
     v.blood_pressure_systolic,
@@ -18,9 +27,7 @@ SELECT
 FROM 
     patients p
 LEFT JOIN 
-    vitals v ON p.patient_id = v.patient_id AND v.recorded_at = (
-        SELECT MAX(recorded_at) FROM vitals WHERE patient_id = p.patient_id
-    )
+    latest_vitals v ON p.patient_id = v.patient_id AND v.rn = 1
 LEFT JOIN 
     delivery_information d ON p.patient_id = d.patient_id
 WHERE 
@@ -41,7 +48,7 @@ ORDER BY
 -- This query identifies patients who missed their follow-up appointments
 SELECT 
     p.patient_id,
-    CONCAT(p.first_name, ' ', p.last_name) AS patient_name,
+    p.patient_name,
     p.phone,
     p.email,
     fv.visit_date AS last_visit_date,
@@ -67,7 +74,7 @@ ORDER BY
 -- This query identifies patients with consistently abnormal vital signs
 SELECT 
     p.patient_id,
-    CONCAT(p.first_name, ' ', p.last_name) AS patient_name,
+    p.patient_name,
     COUNT(v.vital_id) AS total_measurements,
     AVG(v.temperature) AS avg_temperature,
     AVG(v.heart_rate) AS avg_heart_rate,
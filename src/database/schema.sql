@@ -17,8 +17,18 @@ CREATE TABLE patients (
     insurance_id VARCHAR(100),
     emergency_contact_name VARCHAR(100),
     emergency_contact_phone VARCHAR(20),
+    patient_name VARCHAR(201) GENERATED ALWAYS AS (CONCAT(first_name, ' ', last_name)) STORED,
+    -- Bit flags for the contact details the follow-up model uses: 1 city,
+    -- 2 phone, 4 email, 8 insurance. Invisible, so SELECT * is unchanged.
+    contact_flags TINYINT GENERATED ALWAYS AS (
+        (COALESCE(city, '') != '')
+        | (COALESCE(phone, '') != '') << 1
+        | (COALESCE(email, '') != '') << 2
+        | (COALESCE(insurance_provider, '') != '') << 3
+    ) STORED INVISIBLE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_patient_name (patient_name)
 );
 
 -- Medical history table
@@ -29,6 +39,10 @@ CREATE TABLE medical_history (
     diagnosis_date DATE,
     treatment VARCHAR(255),
     notes TEXT,
+    -- Condition flags used by the ML features, computed once on write
+    is_hypertension TINYINT AS (condition_name LIKE '%hypertension%') STORED,
+    is_diabetes TINYINT AS (condition_name LIKE '%diabetes%') STORED,
+    is_asthma TINYINT AS (condition_name LIKE '%asthma%') STORED,
     FOREIGN KEY (patient_id) REFERENCES patients(patient_id)
 );
 
@@ -131,6 +145,26 @@ CREATE INDEX idx_patient_id ON patients(patient_id);
 CREATE INDEX idx_appointment_date ON appointments(appointment_date);
 CREATE INDEX idx_visit_date ON follow_up_visits(visit_date);
 CREATE INDEX idx_delivery_date ON delivery_information(delivery_date);
+-- Covers the latest-vitals lookup without touching the table rows
+CREATE INDEX idx_vitals_patient_recorded ON vitals(patient_id, recorded_at DESC, blood_pressure_systolic, blood_pressure_diastolic);
+-- Overdue follow-ups, and the NOT EXISTS check for a later visit
+CREATE INDEX idx_followup_due ON follow_up_visits(follow_up_required, follow_up_date, patient_id, visit_date);
+CREATE INDEX idx_followup_patient_visit ON follow_up_visits(patient_id, visit_date);
+-- Age-based filters and grouping
+CREATE INDEX idx_patient_dob ON patients(date_of_birth);
+-- Lets the condition flags below be read from the index alone
+CREATE INDEX idx_history_patient_flags ON medical_history(patient_id, is_hypertension, is_diabetes, is_asthma);
+
+-- One row of condition flags per patient, so joining it never multiplies
+-- rows the way joining medical_history directly does
+CREATE VIEW patient_conditions AS
+SELECT
+    patient_id,
+    MAX(is_hypertension) AS has_hypertension,
+    MAX(is_diabetes) AS has_diabetes,
+    MAX(is_asthma) AS has_asthma
+FROM medical_history
+GROUP BY patient_id;
 
 -- User authentication and authorization tables
 CREATE TABLE roles (
@@ -156,7 +190,7 @@ CREATE TABLE users (
 );
 
 CREATE TABLE user_sessions (
-    session_id VARCHAR(255) PRIMARY KEY,
+    session_id VARCHAR(32) PRIMARY KEY,
     user_id INT NOT NULL,
     ip_address VARCHAR(50),
     user_agent TEXT,
@@ -187,4 +221,128 @@ INSERT INTO roles (role_name, description) VALUES
 -- Create indexes for better query performance
 CREATE INDEX idx_user_role ON users(role_id);
 CREATE INDEX idx_user_email ON users(email);
-CREATE INDEX idx_session_user ON user_sessions(user_id); 
\ No newline at end of file
+CREATE INDEX idx_session_user ON user_sessions(user_id); 
+
+-- Analytics summary tables
+-- The high-risk pregnancy and demographics reports are precomputed here so the
+-- API reads indexed rows instead of re-running the joins on every request.
+CREATE TABLE patient_risk_summary (
+    summary_id INT AUTO_INCREMENT PRIMARY KEY,
+    patient_id VARCHAR(50) NOT NULL,
+    patient_name VARCHAR(201),
+    date_of_birth DATE,
+    age INT,
+    blood_pressure_systolic INT,
+    blood_pressure_diastolic INT,
+    complications TEXT,
+    risk_category VARCHAR(32) NOT NULL,
+    risk_priority TINYINT NOT NULL,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_risk_priority (risk_priority),
+    INDEX idx_risk_category (risk_category)
+);
+
+CREATE TABLE patient_demographics_summary (
+    age_group VARCHAR(20) NOT NULL,
+    city VARCHAR(100),
+    state VARCHAR(50),
+    patient_count INT NOT NULL,
+    unique_conditions INT NOT NULL,
+    delivery_count INT NOT NULL,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_demographics_location (state, city, age_group)
+);
+
+DELIMITER //
+
+CREATE PROCEDURE refresh_analytics_summaries()
+BEGIN
+    START TRANSACTION;
+
+    DELETE FROM patient_risk_summary;
+
+    INSERT INTO patient_risk_summary (
+        patient_id, patient_name, date_of_birth, age,
+        blood_pressure_systolic, blood_pressure_diastolic,
+        complications, risk_category, risk_priority
+    )
+    WITH latest_vitals AS (
+        SELECT 
+            patient_id,
+            blood_pressure_systolic,
+            blood_pressure_diastolic,
+            ROW_NUMBER() OVER (PARTITION BY patient_id ORDER BY recorded_at DESC) AS rn
+        FROM 
+            vitals
+    )
+    SELECT 
+        p.patient_id,
+        p.patient_name,
+        p.date_of_birth,
+        TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
+        v.blood_pressure_systolic,
+        v.blood_pressure_diastolic,
+        d.complications,
+        CASE
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 THEN 'Age Risk'
+            WHEN v.blood_pressure_systolic > 140 OR v.blood_pressure_diastolic > 90 THEN 'Hypertension Risk'
+            WHEN d.complications IS NOT NULL AND d.complications != '' THEN 'Previous Complications'
+            ELSE 'Normal'
+        END AS risk_category,
+        CASE
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 AND 
+                (v.blood_pressure_systolic > 140 OR v.blood_pressure_diastolic > 90) THEN 1
+            WHEN v.blood_pressure_systolic > 140 OR v.blood_pressure_diastolic > 90 THEN 2
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 THEN 3
+            ELSE 4
+        END AS risk_priority
+    FROM 
+        patients p
+    LEFT JOIN 
+        latest_vitals v ON p.patient_id = v.patient_id AND v.rn = 1
+    LEFT JOIN 
+        delivery_information d ON p.patient_id = d.patient_id
+    WHERE 
+        (TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) > 35 OR
+        v.blood_pressure_systolic > 140 OR 
+        v.blood_pressure_diastolic > 90 OR
+        (d.complications IS NOT NULL AND d.complications != ''));
+
+    DELETE FROM patient_demographics_summary;
+
+    INSERT INTO patient_demographics_summary (
+        age_group, city, state, patient_count, unique_conditions, delivery_count
+    )
+    SELECT 
+        CASE 
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) < 18 THEN 'Under 18'
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) BETWEEN 18 AND 30 THEN '18-30'
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) BETWEEN 31 AND 45 THEN '31-45'
+            WHEN TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) BETWEEN 46 AND 65 THEN '46-65'
+            ELSE 'Over 65'
+        END AS age_group,
+        p.city,
+        p.state,
+        COUNT(*) AS patient_count,
+        COUNT(DISTINCT m.condition_name) AS unique_conditions,
+        COUNT(DISTINCT d.delivery_id) AS delivery_count
+    FROM 
+        patients p
+    LEFT JOIN 
+        medical_history m ON p.patient_id = m.patient_id
+    LEFT JOIN 
+        delivery_information d ON p.patient_id = d.patient_id
+    GROUP BY 
+        age_group, p.city, p.state;
+
+    COMMIT;
+END //
+
+DELIMITER ;
+
+-- Refresh the summaries hourly (requires event_scheduler=ON)
+CREATE EVENT refresh_analytics_summaries_hourly
+    ON SCHEDULE EVERY 1 HOUR
+    DO CALL refresh_analytics_summaries();
+
+CALL refresh_analytics_summaries();